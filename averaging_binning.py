@@ -8,7 +8,6 @@ import statistics as stat
 from cmath import rect, phase
 from math import radians, degrees, floor
 from datetime import datetime, date
-from copy import deepcopy
 
 import numpy as np
 import numba as nu
@@ -100,6 +99,113 @@ def mean_day_frac(dfr, use_numba=True):
 ###############################################################################
 
 
+def _circ_mean_segments(values, offsets, weights, scale, day_frac, out):
+    """
+    circular mean of values[offsets[k]:offsets[k+1]] for each segment k,
+    as sum of (weighted) unit vectors. scale converts values to degrees
+    (360 for day fractions). NaN values or weights are skipped; a single
+    valid value is returned unchanged, no valid values give NaN.
+    weights may be an empty array (no weights). compiled sequential and
+    parallel (prange across segments) below.
+    """
+    has_w = weights.size > 0
+    for k in nu.prange(offsets.size-1):
+        cnt, s_sin, s_cos, last = 0, 0., 0., np.nan
+        for i in range(offsets[k], offsets[k+1]):
+            w = weights[i] if has_w else 1.
+            if not (np.isfinite(values[i]) and np.isfinite(w)):
+                continue
+            cnt += 1
+            last = values[i]
+            rad = np.radians(values[i]*scale)
+            s_sin += w*np.sin(rad)
+            s_cos += w*np.cos(rad)
+        if cnt == 0:
+            out[k] = np.nan
+        elif cnt == 1:
+            out[k] = last
+        else:
+            deg = np.degrees(np.arctan2(s_sin, s_cos))
+            if day_frac:
+                out[k] = (deg + 360. if deg < 0 else deg) / 360.
+            else:
+                out[k] = deg
+
+_circ_mean_segments_seq = nu.njit(_circ_mean_segments)
+_circ_mean_segments_par = nu.njit(parallel=True)(_circ_mean_segments)
+
+
+def _grouped_circ_mean(values, groups, offsets, weights, parallel, day_frac):
+    values = np.asarray(values, dtype=np.float64)
+    weights = (np.empty(0) if weights is None else
+               np.asarray(weights, dtype=np.float64))
+    if weights.size and weights.shape != values.shape:
+        raise ValueError('weights must have the same shape as values.')
+    if (groups is None) == (offsets is None):
+        raise ValueError('specify either groups or offsets.')
+
+    if groups is not None:
+        if len(groups) != values.size:
+            raise ValueError('groups must have the same length as values.')
+        seg = _bin_segments(groups)
+        if seg['order'] is not None:
+            values = values[seg['order']]
+            weights = weights[seg['order']] if weights.size else weights
+        offsets = np.append(seg['starts'], values.size)
+    else:
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if offsets[0] != 0 or offsets[-1] != values.size or np.any(np.diff(offsets) < 0):
+            raise ValueError('offsets must be non-decreasing from 0 to len(values).')
+
+    out = np.empty(offsets.size-1, dtype=np.float64)
+    kernel = _circ_mean_segments_par if parallel else _circ_mean_segments_seq
+    kernel(values, offsets, weights, 360. if day_frac else 1., day_frac, out)
+
+    return out if groups is None else (seg['ubins'], out)
+
+
+def mean_angle_grouped(deg, groups=None, offsets=None, weights=None, parallel=False):
+    """
+    mean_angle for many groups at once (e.g. wind direction per flight or
+    per time bin), optionally weighted.
+
+    Parameters
+    ----------
+    deg : array-like
+        angles in degrees. NaN is ignored.
+    groups : array-like, optional
+        group label for each element of deg, any order. The default is None.
+    offsets : array-like of int, optional
+        alternative to groups if deg is already sorted by group: segment
+        boundaries from 0 to len(deg), i.e. group k is
+        deg[offsets[k]:offsets[k+1]]. The default is None.
+    weights : array-like, optional
+        weight of each element; elements with NaN weight are ignored.
+        The default is None.
+    parallel : bool, optional
+        compute groups in parallel threads (numba prange). The default is False.
+
+    Returns
+    -------
+    tuple (unique group labels, mean angles) if groups is specified, mean
+    angles if offsets is specified. mean angles are between -180 and +180;
+    groups with a single value give that value, groups without values NaN.
+
+    """
+    return _grouped_circ_mean(deg, groups, offsets, weights, parallel, False)
+
+
+def mean_day_frac_grouped(dfr, groups=None, offsets=None, weights=None, parallel=False):
+    """
+    mean_day_frac for many groups at once (e.g. local time per time bin),
+    see mean_angle_grouped. returns mean day fractions (0-1).
+    """
+    return _grouped_circ_mean(dfr, groups, offsets, weights, parallel, True)
+
+
+###############################################################################
+
+
 def mask_repeated(a, N):
     """
     given an array a that consists of sections of repeated elements, mask
@@ -234,10 +340,182 @@ def bin_time_10s(t, force_t_range=True):
 ###############################################################################
 
 
+@nu.njit
+def _bin_coverage(t, offsets, edges, sampling_interval, coverage, max_gap):
+    """
+    coverage fraction and largest gap (including gaps to the bin edges) per
+    bin. element i is taken to represent the time from t[i] to the next
+    element, at most sampling_interval.
+    """
+    for k in range(offsets.size-1):
+        a, b = offsets[k], offsets[k+1]
+        width = edges[k+1] - edges[k]
+        if a == b:
+            coverage[k], max_gap[k] = 0., width
+            continue
+        covered, gap = 0., t[a] - edges[k]
+        for i in range(a, b):
+            dt_next = t[i+1] - t[i] if i+1 < t.size else sampling_interval
+            covered += min(dt_next, sampling_interval)
+            if i > a:
+                gap = max(gap, t[i] - t[i-1])
+        coverage[k] = min(covered/width, 1.)
+        max_gap[k] = max(gap, edges[k+1] - t[b-1])
+
+
+def resample_time(t, binwidth, *, offset=0., closed='left', label='center',
+                  t_range=None, force_t_range=False, sampling_interval=None,
+                  max_gap=None, min_coverage=0.):
+    """
+    bin a (possibly irregular) time vector to an arbitrary bin width. the
+    start of each bin in t is found with one np.searchsorted call (bin edges
+    into t). the output can be used like that of bin_time / bin_time_10s,
+    e.g. for bin_y_of_t.
+
+    inputs:
+        t: time vector, increasing monotonically, np.ndarray, 1D.
+        binwidth: bin width in units of t.
+        offset: alignment; bin edges are offset + k*binwidth.
+        closed: 'left' ([lower, upper), as bin_time_10s) or 'right'
+                ((lower, upper]).
+        label: 't_binned' gives the 'left', 'center' or 'right' of the bins.
+        t_range: optional (start, end) of the binned time axis; elements
+                 outside are excluded (cut_first / cut_last). default: range
+                 of t.
+        force_t_range: as in bin_time_10s, exclude the first / last bin if
+                       its centre is outside t_range (elements in it are
+                       excluded, cut_first / cut_last). default False, i.e.
+                       all bins that contain data in t_range are used.
+        sampling_interval: nominal sampling interval, used for the coverage.
+                           default: median difference of t.
+        max_gap: bins with a gap between elements (or to a bin edge) larger
+                 than max_gap are masked, i.e. give NaN in bin_y_of_t.
+        min_coverage: bins with a coverage fraction below this are masked.
+    returns:
+        dict with
+            't_binned': time axis, one element per bin that contains data,
+            'bins', 'mask', 'cut_first', 'cut_last': see bin_time,
+            'n_per_bin', 'coverage' (fraction of the bin width covered by
+            data, elements taken to represent at most sampling_interval),
+            'max_gap': per element of t_binned,
+            'edges': all bin edges (including empty bins).
+    """
+    t = np.asarray(t, dtype=np.float64)
+    if t.ndim != 1 or t.size == 0:
+        raise ValueError('t must be a non-empty 1D array.')
+    if np.any(t[1:] < t[:-1]):
+        raise ValueError('t must be increasing monotonically.')
+    if closed not in ('left', 'right'):
+        raise ValueError("closed must be 'left' or 'right'.")
+
+    t_start, t_end = (t[0], t[-1]) if t_range is None else t_range
+    if closed == 'left':
+        k0, k1 = np.floor((t_start-offset)/binwidth), np.floor((t_end-offset)/binwidth) + 1
+    else:
+        k0, k1 = np.ceil((t_start-offset)/binwidth) - 1, np.ceil((t_end-offset)/binwidth)
+    if force_t_range:
+        k0 += offset + (k0+0.5)*binwidth < t_start
+        k1 -= offset + (k1-0.5)*binwidth > t_end
+        if k1 <= k0:
+            raise ValueError('no bin centre within the range of t.')
+    edges = offset + np.arange(k0, k1+1)*binwidth
+    n_bins = edges.size-1
+
+    offsets = np.searchsorted(t, edges, side=closed)
+    n_per_bin = np.diff(offsets)
+    # elements before / after the binned range get bin -1 / n_bins:
+    counts = np.concatenate(([offsets[0]], n_per_bin, [t.size-offsets[-1]]))
+    bins = np.repeat(np.arange(-1, n_bins+1), counts)
+
+    if sampling_interval is None:
+        sampling_interval = np.median(np.diff(t)) if t.size > 1 else binwidth
+    coverage, gaps = np.empty(n_bins), np.empty(n_bins)
+    _bin_coverage(t, offsets, edges, float(sampling_interval), coverage, gaps)
+
+    bin_ok = coverage >= min_coverage
+    if max_gap is not None:
+        bin_ok &= gaps <= max_gap
+    mask = np.repeat(np.concatenate(([False], bin_ok, [False])), counts)
+
+    filled = n_per_bin > 0
+    t_binned = {'left': edges[:-1], 'center': edges[:-1] + binwidth/2,
+                'right': edges[1:]}[label]
+
+    return {'t_binned': t_binned[filled],
+            'bins': bins,
+            'mask': mask,
+            'cut_first': bool(offsets[0] > 0),
+            'cut_last': bool(offsets[-1] < t.size),
+            'n_per_bin': n_per_bin[filled],
+            'coverage': coverage[filled],
+            'max_gap': gaps[filled],
+            'edges': edges}
+
+
+###############################################################################
+
+
 @nu.njit
 def get_npnanmean(v):
     return np.nanmean(v)
 
+
+@nu.njit
+def _n_segments(bins):
+    """
+    number of segments of equal elements in bins; -1 if bins is not sorted.
+    """
+    if bins.size == 0:
+        return 0
+    n = 1
+    for i in range(1, bins.size):
+        if bins[i] < bins[i-1]:
+            return -1
+        if bins[i] != bins[i-1]:
+            n += 1
+    return n
+
+
+@nu.njit
+def _bin_mean_kernel(v, bins, mask, vmiss, mode, out):
+    """
+    single pass over v with non-decreasing bins; sum / count accumulators
+    per bin (sin / cos components for mode 1, mean angle, and mode 2, mean
+    day fraction). values that are not finite, equal vmiss or where mask is
+    False are skipped. mask may be an empty array (no mask).
+    results are written to out (one element per segment of equal bins).
+    """
+    has_mask = mask.size > 0
+    j, cnt, s, s_sin, s_cos = 0, 0, 0., 0., 0.
+    for i in range(v.size):
+        if i > 0 and bins[i] != bins[i-1]: # bin complete
+            out[j] = _finalize_mean(cnt, s, s_sin, s_cos, mode)
+            j, cnt, s, s_sin, s_cos = j+1, 0, 0., 0., 0.
+        x = float(v[i])
+        if not np.isfinite(x) or x == vmiss or (has_mask and not mask[i]):
+            continue
+        cnt += 1
+        s += x
+        if mode > 0:
+            rad = np.radians(x*360. if mode == 2 else x)
+            s_sin += np.sin(rad)
+            s_cos += np.cos(rad)
+    if v.size:
+        out[j] = _finalize_mean(cnt, s, s_sin, s_cos, mode)
+
+
+@nu.njit
+def _finalize_mean(cnt, s, s_sin, s_cos, mode):
+    if cnt == 0:
+        return np.nan
+    if mode == 0 or cnt == 1: # single value is returned unchanged
+        return s/cnt
+    deg = np.degrees(np.arctan2(s_sin, s_cos))
+    if mode == 2:
+        return (deg + 360. if deg < 0 else deg) / 360.
+    return deg
+
+
 def bin_y_of_t(v, bin_info,
                   vmiss=np.nan,
                   return_type='arit_mean',
@@ -245,6 +523,10 @@ def bin_y_of_t(v, bin_info,
     """
     use 'bins' output of function "bin_time" or "bin_time_10s"
         to bin a variable 'v' that depends on a variable t.
+    the input is not copied; with use_numba, one pass over v accumulates
+    sum and count per bin (also for int input), so memory usage is
+    determined by the output size. if bins is not sorted, v, bins and mask
+    are sorted first (copies).
     """
     if not isinstance(v, np.ndarray):
         raise TypeError('Please pass np.ndarray to function.')
@@ -253,59 +535,922 @@ def bin_y_of_t(v, bin_info,
                                                  'float16', 'float32', 'float64')]):
         raise TypeError('Please pass valid dtype, int or float.')
 
-    if 'mask' in bin_info.keys():
-        mask = bin_info['mask']
+    modes = {'arit_mean': 0, 'mean_angle': 1, 'mean_day_frac': 2}
+    if return_type not in modes:
+        raise ValueError(f"invalid return_type '{return_type}'")
+
+    mask = bin_info.get('mask', np.empty(0, dtype=np.bool_))
+    vd_bins = bin_info['bins']
+
+    if use_numba:
+        n_bins = _n_segments(vd_bins)
+        if n_bins < 0:
+            order = np.argsort(vd_bins, kind='stable')
+            v, vd_bins = v[order], vd_bins[order]
+            mask = mask[order] if mask.size else mask
+            n_bins = _n_segments(vd_bins)
+        v_binned = np.empty(n_bins, dtype=np.float64)
+        # compare in the dtype of v, as v == vmiss does for the numpy path
+        # (e.g. float32(99999.999) != 99999.999):
+        vmiss_v = float(v.dtype.type(vmiss)) if v.dtype.kind == 'f' else float(vmiss)
+        _bin_mean_kernel(v, vd_bins, mask, vmiss_v, modes[return_type], v_binned)
+    else:
+        v_binned = bin_stats_y_of_t(v, {'bins': vd_bins, 'mask': mask,
+                                        'cut_first': False, 'cut_last': False},
+                                    vmiss=vmiss, return_type=return_type,
+                                    stats=('mean',))['mean']
+
+    if v.dtype.kind == 'f':
+        result = v_binned.astype(v.dtype, copy=False)
     else:
-        mask = np.ones(v.shape).astype(np.bool_)
+        result = np.rint(v_binned).astype(v.dtype)
+
+    if bin_info['cut_first']:
+        result = result[1:]
+    if bin_info['cut_last']:
+        result = result[:-1]
+
+    return result
 
-    _v = deepcopy(v)
 
-    if any([_v.dtype == np.dtype(t) for t in ('int16', 'int32', 'int64')]):
-        _v = np.ma.array(_v) # use a masked array if type is int (NaN not supported)
-        _v.mask = ~mask
-        _v[_v==vmiss] = np.ma.masked
+###############################################################################
+
 
+def _bin_segments(bins):
+    """
+    sort the bin numbers once (stable; no sorting needed if bins is already
+    non-decreasing, e.g. from bin_time) and find the segments of equal bins.
+    returns:
+        dict with sort order (None if bins was sorted), start index of each
+        segment in sorted order, unique bin numbers and segment lengths.
+    """
+    bins = np.asarray(bins)
+    if np.all(bins[1:] >= bins[:-1]):
+        order, bins_sorted = None, bins
     else:
-        _v[_v==vmiss] = np.nan
-        _v[~mask] = np.nan
+        order = np.argsort(bins, kind='stable')
+        bins_sorted = bins[order]
+    starts = np.flatnonzero(np.concatenate(([True], bins_sorted[1:] != bins_sorted[:-1])))
+    return {'order': order,
+            'starts': starts,
+            'ubins': bins_sorted[starts],
+            'lengths': np.diff(np.append(starts, bins_sorted.size))}
 
-    v_binned = []
-    v_dtype = _v.dtype
-    vd_bins = bin_info['bins']
 
-    if return_type == 'arit_mean':
-        if use_numba:
-            v_binned = [get_npnanmean(_v[vd_bins == bin_no]) for bin_no in np.unique(vd_bins)]
-        else:
-            v_binned = [np.nanmean(_v[vd_bins == bin_no]) for bin_no in np.unique(vd_bins)]
-    elif return_type == 'mean_day_frac':
-        if use_numba:
-            v_binned = [mean_day_frac(_v[vd_bins == bin_no]) for bin_no in np.unique(vd_bins)]
-        else:
-            v_binned = [mean_day_frac(_v[vd_bins == bin_no], use_numba=False) for bin_no in np.unique(vd_bins)]
-    elif return_type == 'mean_angle':
-        if use_numba:
-            v_binned = [mean_angle_numba(_v[vd_bins == bin_no]) for bin_no in np.unique(vd_bins)]
+def _segment_stats(v, seg, stats=('mean',), return_type='arit_mean', ddof=0):
+    """
+    compute statistics for all segments of v (float, sorted according to
+    seg, see _bin_segments) in one pass with np.add.reduceat etc.
+    v can be 1D or 2D (one column per variable; reductions along axis 0).
+    non-finite values are ignored. bins without valid values give NaN.
+    """
+    starts, lengths = seg['starts'], seg['lengths']
+    valid = np.isfinite(v)
+    v_0 = np.where(valid, v, 0.)
+    n = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        arit_mean = np.add.reduceat(v_0, starts, axis=0) / n
+
+    result = {}
+    if 'count' in stats:
+        result['count'] = n
+
+    if 'mean' in stats:
+        if return_type == 'arit_mean':
+            result['mean'] = arit_mean
+        elif return_type in ('mean_angle', 'mean_day_frac'):
+            rad = np.deg2rad(v_0*360 if return_type == 'mean_day_frac' else v_0)
+            mean = np.rad2deg(np.arctan2(np.add.reduceat(np.where(valid, np.sin(rad), 0.), starts, axis=0),
+                                         np.add.reduceat(np.where(valid, np.cos(rad), 0.), starts, axis=0)))
+            if return_type == 'mean_day_frac':
+                mean = np.where(mean < 0, mean+360, mean) / 360
+            # single values are returned unchanged, as by mean_angle / mean_day_frac:
+            result['mean'] = np.where(n == 1, arit_mean, np.where(n == 0, np.nan, mean))
         else:
-            v_binned = [mean_angle(_v[vd_bins == bin_no]) for bin_no in np.unique(vd_bins)]
+            raise ValueError(f"invalid return_type '{return_type}'")
+
+    if 'std' in stats:
+        dev = np.where(valid, v - np.repeat(arit_mean, lengths, axis=0), 0.)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result['std'] = np.sqrt(np.add.reduceat(dev*dev, starts, axis=0) / (n-ddof))
+        result['std'][n-ddof <= 0] = np.nan
+
+    v_nan = np.where(valid, v, np.nan)
+    if 'min' in stats:
+        result['min'] = np.fmin.reduceat(v_nan, starts, axis=0)
+    if 'max' in stats:
+        result['max'] = np.fmax.reduceat(v_nan, starts, axis=0)
+
+    if 'median' in stats: # sort within segments once; NaN are sorted last
+        seg_ix = np.repeat(np.arange(starts.size), lengths)
+        lo = starts[:, None] + np.maximum(n.reshape(starts.size, -1)-1, 0)//2
+        hi = np.minimum(starts[:, None] + n.reshape(starts.size, -1)//2, seg_ix.size-1)
+        v_nan = v_nan.reshape(seg_ix.size, -1)
+        median = np.full(lo.shape, np.nan)
+        for j in range(v_nan.shape[1]):
+            v_sorted = v_nan[np.lexsort((v_nan[:, j], seg_ix)), j]
+            median[:, j] = (v_sorted[lo[:, j]] + v_sorted[hi[:, j]])/2
+        median[n.reshape(median.shape) == 0] = np.nan
+        result['median'] = median.reshape(n.shape)
+
+    return result
 
 
-    if any([v_dtype == np.dtype(t) for t in ('float16', 'float32', 'float64')]):
-        result = np.array(v_binned)
-    else:
-        result =  np.rint(v_binned).astype(v_dtype)
+def bin_stats_y_of_t(v, bin_info,
+                     vmiss=np.nan,
+                     return_type='arit_mean',
+                     stats=('mean', 'count', 'std', 'min', 'max', 'median'),
+                     ddof=0):
+    """
+    vectorized alternative to bin_y_of_t that computes several statistics
+    for all bins at once. the bin numbers are sorted once and all reductions
+    run over the segments of equal bin number (np.add.reduceat), so the run
+    time scales with the number of elements, not elements x bins.
+    inputs:
+        v: np.ndarray, variable to bin, int or float.
+        bin_info: output of function "bin_time" or "bin_time_10s".
+        vmiss: missing value indicator, ignored in calculations.
+        return_type: type of 'mean'; 'arit_mean', 'mean_angle' (degrees,
+                     -180 to +180) or 'mean_day_frac' (0-1).
+        stats: statistics to compute; 'mean', 'count', 'std', 'min', 'max',
+               'median'.
+        ddof: delta degrees of freedom for 'std'.
+    returns:
+        dict with a float array for each statistic (int for 'count'),
+        one element per bin (same length as output of bin_y_of_t).
+    """
+    if not isinstance(v, np.ndarray):
+        raise TypeError('Please pass np.ndarray to function.')
+
+    _v = v.astype(np.float64)
+    _v[v == vmiss] = np.nan
+    if bin_info.get('mask') is not None and bin_info['mask'].size:
+        _v[~bin_info['mask']] = np.nan
+
+    seg = _bin_segments(bin_info['bins'])
+    if seg['order'] is not None:
+        _v = _v[seg['order']]
+
+    result = _segment_stats(_v, seg, stats=stats, return_type=return_type, ddof=ddof)
+
+    for k in result:
+        if bin_info['cut_first']:
+            result[k] = result[k][1:]
+        if bin_info['cut_last']:
+            result[k] = result[k][:-1]
+
+    return result
+
+
+###############################################################################
+
+
+def bin_y_of_t_multi(V, bin_info,
+                     vmiss=np.nan,
+                     return_type='arit_mean'):
+    """
+    bin many variables that depend on the same t at once, using the output
+    of function "bin_time" or "bin_time_10s". the bin index is sorted once and
+    all variables are reduced together (np.add.reduceat along axis 0).
+    inputs:
+        V: 2D np.ndarray (one column per variable) or pandas DataFrame.
+        bin_info: output of function "bin_time" or "bin_time_10s".
+        vmiss: missing value indicator; scalar or one per column.
+        return_type: 'arit_mean', 'mean_angle' or 'mean_day_frac'; one for
+                     all columns or a list (dict for DataFrame, by column
+                     name; columns not in the dict get 'arit_mean') with
+                     one per column.
+    returns:
+        2D np.ndarray (bins x variables) or DataFrame with the same columns
+        as V. each column equals the output of bin_y_of_t for that column
+        (as float).
+    """
+    columns = None
+    if isinstance(V, pd.DataFrame):
+        columns = V.columns
+        if isinstance(return_type, dict):
+            return_type = [return_type.get(c, 'arit_mean') for c in columns]
+        if isinstance(vmiss, dict):
+            vmiss = [vmiss.get(c, np.nan) for c in columns]
+        V = V.to_numpy()
+
+    if not isinstance(V, np.ndarray) or V.ndim != 2:
+        raise TypeError('Please pass 2D np.ndarray or pd.DataFrame to function.')
+
+    n_cols = V.shape[1]
+    if isinstance(return_type, str):
+        return_type = [return_type]*n_cols
+    if len(return_type) != n_cols:
+        raise ValueError('return_type must be specified for each column.')
+
+    # compare in the dtype of V, as bin_y_of_t does:
+    vmiss = np.asarray(vmiss, dtype=V.dtype if V.dtype.kind == 'f' else np.float64)
+    _V = V.astype(np.float64)
+    _V[V == np.broadcast_to(vmiss, (n_cols,))] = np.nan
+    if 'mask' in bin_info.keys():
+        _V[~bin_info['mask']] = np.nan
+
+    seg = _bin_segments(bin_info['bins'])
+    if seg['order'] is not None:
+        _V = _V[seg['order']]
+
+    result = _segment_stats(_V, seg)['mean']
+    for rt in ('mean_angle', 'mean_day_frac'):
+        cols = [j for j, r in enumerate(return_type) if r == rt]
+        if cols:
+            result[:, cols] = _segment_stats(_V[:, cols], seg, return_type=rt)['mean']
 
     if bin_info['cut_first']:
         result = result[1:]
     if bin_info['cut_last']:
         result = result[:-1]
 
+    return result if columns is None else pd.DataFrame(result, columns=columns)
+
+
+###############################################################################
+
+
+class OnlineBinner:
+    """
+    bin a data stream, i.e. chunks of (t, v) of arbitrary size, to a fixed
+    bin width without keeping the whole time series. bins are defined like
+    in bin_time_10s: [origin + k*binwidth, origin + (k+1)*binwidth), bin
+    centre origin + (k+0.5)*binwidth. for each open bin, running count,
+    mean and sum of squared deviations (Welford; chunks are merged with the
+    parallel update of Chan et al.) and, for angles and day fractions, sin /
+    cos sums are kept. a bin is completed as soon as data of a later bin
+    arrives (or with advance / flush). only bins that contain data are
+    emitted, as with bin_time_10s.
+
+    inputs:
+        binwidth: bin width in units of t. default 10.
+        return_type: 'arit_mean', 'mean_angle' or 'mean_day_frac'; one for
+                     all variables or a list with one per column of v.
+        vmiss: missing value indicator, scalar or one per column.
+        ddof: delta degrees of freedom for 'std'.
+        origin: bin edges are multiples of binwidth from origin. default 0.
+        force_t_range: as in bin_time_10s, only emit bins with centre within
+                       the range of t, i.e. drop the first bin if its centre
+                       is before the first t of the stream and the last bin
+                       (flush) if its centre is after the last t. a bin
+                       completed by advance with centre after the last t is
+                       held back until the next update (then emitted).
+                       default False: all bins that contain data are emitted
+                       (one or two more than bin_time_10s(t) gives).
+    """
+    def __init__(self, binwidth=10, return_type='arit_mean',
+                 vmiss=np.nan, ddof=0, origin=0., force_t_range=False):
+        self.binwidth, self.origin, self.ddof = binwidth, origin, ddof
+        self.return_type, self.vmiss = return_type, vmiss
+        self.force_t_range = force_t_range
+        self._open = None # accumulators of the open bin
+        self._pending = None # completed bin held back by advance (force_t_range)
+        self._t_last = -np.inf
+        self._t_range = [np.nan, np.nan] # first and last t of the data
+        self._ndim = None
+
+    def _accumulate(self, t, v):
+        """
+        accumulators for all segments of equal bin number in one chunk.
+        """
+        bins = np.floor((t - self.origin) / self.binwidth).astype(np.int64)
+        seg = _bin_segments(bins)
+        starts, lengths = seg['starts'], seg['lengths']
+
+        valid = np.isfinite(v) # vmiss is NaN already, see update
+        v_0 = np.where(valid, v, 0.)
+        n = np.add.reduceat(valid, starts, axis=0).astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, np.add.reduceat(v_0, starts, axis=0) / n, 0.)
+        dev = np.where(valid, v - np.repeat(mean, lengths, axis=0), 0.)
+        rad = np.deg2rad(v_0*self._scale)
+        return {'bin': seg['ubins'], 'n': n, 'mean': mean,
+                'm2': np.add.reduceat(dev*dev, starts, axis=0),
+                'sin': np.add.reduceat(np.where(valid, np.sin(rad), 0.), starts, axis=0),
+                'cos': np.add.reduceat(np.where(valid, np.cos(rad), 0.), starts, axis=0)}
+
+    @staticmethod
+    def _merge(a, b):
+        """
+        merge accumulators b (one row) into a (one row) of the same bin.
+        """
+        n = a['n'] + b['n']
+        delta = b['mean'] - a['mean']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frac_b = np.where(n > 0, b['n'] / n, 0.)
+        return {'bin': a['bin'], 'n': n,
+                'mean': a['mean'] + delta*frac_b,
+                'm2': a['m2'] + b['m2'] + delta*delta*a['n']*frac_b,
+                'sin': a['sin'] + b['sin'], 'cos': a['cos'] + b['cos']}
+
+    def _finalize(self, acc):
+        """
+        statistics of completed bins from their accumulators.
+        """
+        n = acc['n']
+        mean = np.where(n > 0, acc['mean'], np.nan)
+        circ = self._circ
+        if circ.any():
+            deg = np.rad2deg(np.arctan2(acc['sin'][:, circ], acc['cos'][:, circ]))
+            day_frac = self._scale[circ] == 360.
+            deg = np.where(day_frac, np.where(deg < 0, deg+360, deg)/360, deg)
+            # single values are returned unchanged, as by mean_angle / mean_day_frac:
+            mean[:, circ] = np.where(n[:, circ] == 1, mean[:, circ], deg)
+            mean[n == 0] = np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(acc['m2'] / (n-self.ddof))
+        std[n-self.ddof <= 0] = np.nan
+
+        result = {'t_binned': self.origin + (acc['bin']+0.5)*self.binwidth,
+                  'mean': mean, 'count': n, 'std': std}
+        if self._ndim == 1:
+            for k in ('mean', 'count', 'std'):
+                result[k] = result[k][:, 0]
+        return result
+
+    def _in_t_range(self, result, last=False):
+        """
+        with force_t_range, drop bins with centre before the first t and,
+        for the last bin, after the last t of the data.
+        """
+        if not self.force_t_range:
+            return result
+        keep = result['t_binned'] >= self._t_range[0]
+        if last:
+            keep &= result['t_binned'] <= self._t_range[1]
+        return {k: a[keep] for k, a in result.items()}
+
+    def _empty(self):
+        return self._finalize({'bin': np.empty(0, dtype=np.int64),
+                               'n': np.empty((0, self._n_cols), dtype=np.int64),
+                               **{k: np.empty((0, self._n_cols)) for k in
+                                  ('mean', 'm2', 'sin', 'cos')}})
+
+    def _setup(self, v):
+        self._ndim, self._n_cols = v.ndim, (1 if v.ndim == 1 else v.shape[1])
+        return_type = self.return_type
+        if isinstance(return_type, str):
+            return_type = [return_type]*self._n_cols
+        if len(return_type) != self._n_cols:
+            raise ValueError('return_type must be specified for each column.')
+        scales = {'arit_mean': 0., 'mean_angle': 1., 'mean_day_frac': 360.}
+        for rt in return_type:
+            if rt not in scales:
+                raise ValueError(f"invalid return_type '{rt}'")
+        self._scale = np.array([scales[rt] for rt in return_type])
+        self._circ = self._scale > 0
+        self._vmiss = np.broadcast_to(np.asarray(self.vmiss, dtype=np.float64),
+                                      (self._n_cols,))
+
+    def update(self, t, v):
+        """
+        add a chunk of data. t must be strictly increasing, also across
+        chunks. v: 1D (one variable) or 2D (one column per variable), same
+        number of elements / rows as t.
+        returns:
+            dict with keys 't_binned', 'mean', 'count', 'std' for the bins
+            that were completed by this chunk (possibly none).
+        """
+        t = np.asarray(t, dtype=np.float64)
+        v = np.asarray(v)
+        if self._ndim is None:
+            self._setup(v)
+        if v.ndim != self._ndim or v.shape[0] != t.size:
+            raise ValueError('v must match t and the shape of previous chunks.')
+        if t.size == 0:
+            return self._empty()
+        if t[0] <= self._t_last or np.any(t[1:] <= t[:-1]):
+            raise ValueError('t must be strictly increasing.')
+        self._t_last = t[-1]
+        if np.isnan(self._t_range[0]):
+            self._t_range[0] = t[0]
+        self._t_range[1] = t[-1]
+
+        # compare with vmiss in the dtype of v (e.g. float32), then set NaN:
+        v = v.reshape(t.size, self._n_cols)
+        missing = v == self._vmiss.astype(v.dtype if v.dtype.kind == 'f' else np.float64)
+        v = v.astype(np.float64)
+        v[missing] = np.nan
+
+        acc = self._accumulate(t, v)
+        if self._open is not None:
+            if self._open['bin'][0] == acc['bin'][0]:
+                first = self._merge(self._open, {k: a[:1] for k, a in acc.items()})
+                acc = {k: np.concatenate((first[k], a[1:])) for k, a in acc.items()}
+            else:
+                acc = {k: np.concatenate((self._open[k], a)) for k, a in acc.items()}
+
+        self._open = {k: a[-1:] for k, a in acc.items()}
+        result = self._in_t_range(self._finalize({k: a[:-1] for k, a in acc.items()}))
+        if self._pending is not None: # more data, so it was not the last bin
+            result = {k: np.concatenate((self._pending[k], a)) for k, a in result.items()}
+            self._pending = None
+        return result
+
+    def advance(self, t):
+        """
+        complete the open bin if t (e.g. current time) is past its end, so
+        that it is emitted without waiting for more data. returns dict like
+        update.
+        """
+        if self._open is None:
+            return self._empty() if self._ndim else None
+        bin_end = self.origin + (self._open['bin'][0]+1)*self.binwidth
+        if t < bin_end:
+            return self._empty()
+        self._t_last = max(self._t_last, np.nextafter(bin_end, -np.inf))
+        result = self._in_t_range(self._finalize(self._open))
+        self._open = None
+        if self.force_t_range and np.any(result['t_binned'] > self._t_range[1]):
+            # only dropped if it turns out to be the last bin (flush), emitted
+            # with the next update otherwise
+            self._pending, result = result, self._empty()
+        return result
+
+    def flush(self):
+        """
+        complete and return the open bin (e.g. at the end of the stream).
+        returns dict like update.
+        """
+        self._pending = None # last bin, centre after the last t
+        if self._open is None:
+            return self._empty() if self._ndim else None
+        result = self._in_t_range(self._finalize(self._open), last=True)
+        self._open = None
+        return result
+
+
+###############################################################################
+
+
+class NDBinGrid:
+    """
+    N-dimensional binning, e.g. latitude x pressure altitude x season, with
+    statistics per grid cell (count, mean, std and, optionally, quantiles).
+    per cell, count, mean and sum of squared deviations (and a histogram of
+    values for quantiles) are accumulated, so that grids computed from
+    different data (e.g. per flight, in parallel processes) can be merged
+    exactly.
+
+    inputs:
+        edges: list of bin edges (1D, strictly increasing), one per
+               dimension; lower edge included, upper edge excluded (as in
+               bin_time_10s). data outside the edges is ignored.
+        q_edges: optional edges of a value histogram per cell, used to
+                 estimate quantiles (linear interpolation within histogram
+                 bins, i.e. resolution is given by q_edges). values outside
+                 q_edges are counted in the first / last histogram bin.
+        sparse: only store non-empty cells (for large, mostly empty grids).
+        names: optional names of the dimensions, used by to_frame.
+    """
+    def __init__(self, edges, q_edges=None, sparse=False, names=None):
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        for e in self.edges:
+            if e.ndim != 1 or e.size < 2 or np.any(np.diff(e) <= 0):
+                raise ValueError('edges must be strictly increasing 1D arrays.')
+        self.shape = tuple(e.size-1 for e in self.edges)
+        self.n_cells = int(np.prod(self.shape))
+        self.q_edges = None if q_edges is None else np.asarray(q_edges, dtype=np.float64)
+        self.sparse = sparse
+        self.names = list(names) if names else [f"x{i}" for i in range(len(self.edges))]
+        if len(self.names) != len(self.edges):
+            raise ValueError('specify one name per dimension.')
+
+        size = 0 if sparse else self.n_cells
+        self._keys = np.empty(0, dtype=np.int64) if sparse else np.arange(self.n_cells)
+        self._n = np.zeros(size, dtype=np.int64)
+        self._mean, self._m2 = np.zeros(size), np.zeros(size)
+        self._hist = (None if self.q_edges is None else
+                      np.zeros((size, self.q_edges.size-1), dtype=np.int64))
+
+    @property
+    def centres(self):
+        """ bin centres for each dimension. """
+        return [(e[:-1]+e[1:])/2 for e in self.edges]
+
+    def _flat_index(self, coords):
+        """
+        flat cell index for each data point; -1 if outside the grid.
+        """
+        ix = [np.searchsorted(e, c, side='right')-1 for e, c in zip(self.edges, coords)]
+        inside = np.logical_and.reduce([(i >= 0) & (i < n) for i, n in zip(ix, self.shape)])
+        flat = np.full(inside.size, -1, dtype=np.int64)
+        flat[inside] = np.ravel_multi_index([i[inside] for i in ix], self.shape)
+        return flat
+
+    def add(self, coords, v, vmiss=np.nan):
+        """
+        add data in a single pass.
+        inputs:
+            coords: list of 1D arrays (one per dimension) or 2D array
+                    (one column per dimension), same length as v.
+            v: 1D array, variable to bin. NaN and vmiss are ignored.
+        returns:
+            self
+        """
+        if isinstance(coords, np.ndarray) and coords.ndim == 2:
+            coords = coords.T
+        coords = [np.asarray(c, dtype=np.float64) for c in coords]
+        v = np.asarray(v)
+        if len(coords) != len(self.edges) or any(c.shape != v.shape for c in coords):
+            raise ValueError('specify one coordinate array per dimension, same length as v.')
+        not_vmiss = v != vmiss # compare in the dtype of v, e.g. float32
+        v = v.astype(np.float64)
+
+        flat = self._flat_index(coords)
+        valid = (flat >= 0) & np.isfinite(v) & not_vmiss
+        flat, v = flat[valid], v[valid]
+
+        if self.sparse:
+            keys, inv = np.unique(flat, return_inverse=True)
+        else:
+            keys, inv = self._keys, flat
+        size = keys.size
+
+        n = np.bincount(inv, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, np.bincount(inv, weights=v, minlength=size) / n, 0.)
+        dev = v - mean[inv]
+        m2 = np.bincount(inv, weights=dev*dev, minlength=size)
+        hist = None
+        if self.q_edges is not None:
+            n_q = self.q_edges.size-1
+            q_ix = np.clip(np.searchsorted(self.q_edges, v, side='right')-1, 0, n_q-1)
+            hist = np.bincount(inv*n_q + q_ix, minlength=size*n_q).reshape(size, n_q)
+
+        self._combine(keys, n, mean, m2, hist)
+        return self
+
+    def _combine(self, keys, n, mean, m2, hist):
+        """
+        merge accumulators of cells keys into the grid (parallel variance
+        algorithm, Chan et al.).
+        """
+        if self.sparse:
+            ukeys, inv = np.unique(np.concatenate((self._keys, keys)), return_inverse=True)
+        else:
+            ukeys, inv = self._keys, np.concatenate((self._keys, keys))
+        size = ukeys.size
+        n_all = np.concatenate((self._n, n))
+        mean_all = np.concatenate((self._mean, mean))
+
+        n_tot = np.bincount(inv, weights=n_all, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_tot = np.where(n_tot > 0,
+                                np.bincount(inv, weights=n_all*mean_all, minlength=size) / n_tot, 0.)
+        delta = mean_all - mean_tot[inv]
+        self._m2 = np.bincount(inv, weights=np.concatenate((self._m2, m2)) + n_all*delta*delta,
+                               minlength=size)
+        self._keys, self._n, self._mean = ukeys, n_tot.astype(np.int64), mean_tot
+        if self._hist is not None:
+            # keys are unique within each part, so no buffered addition is needed:
+            hist_tot = np.zeros((size, self._hist.shape[1]), dtype=np.int64)
+            hist_tot[inv[:len(self._hist)]] += self._hist
+            hist_tot[inv[len(self._hist):]] += hist
+            self._hist = hist_tot
+
+    def merge(self, other):
+        """
+        merge another NDBinGrid with the same edges (and q_edges) into this
+        one, e.g. grids computed per flight. returns self.
+        """
+        if (len(other.edges) != len(self.edges) or
+                not all(np.array_equal(a, b) for a, b in zip(self.edges, other.edges)) or
+                (self.q_edges is None) != (other.q_edges is None) or
+                (self.q_edges is not None and not np.array_equal(self.q_edges, other.q_edges))):
+            raise ValueError('grids must have the same edges and q_edges.')
+        self._combine(other._keys, other._n, other._mean, other._m2, other._hist)
+        return self
+
+    def _quantiles(self, quantiles):
+        """
+        quantiles per cell from the value histograms.
+        """
+        cum = np.cumsum(self._hist, axis=1)
+        widths = np.diff(self.q_edges)
+        result = np.full((len(quantiles), self._n.size), np.nan)
+        rows = np.arange(self._n.size)
+        for k, q in enumerate(quantiles):
+            target = np.maximum(q*self._n, 1e-9)
+            j = np.argmax(cum >= target[:, None], axis=1)
+            h = self._hist[rows, j]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                frac = np.clip((target - (cum[rows, j]-h)) / h, 0., 1.)
+            result[k] = np.where(self._n > 0, self.q_edges[j] + frac*widths[j], np.nan)
+        return result
+
+    def statistics(self, ddof=0, quantiles=(0.25, 0.5, 0.75)):
+        """
+        statistics per cell.
+        returns:
+            dict with 'count', 'mean', 'std' and, if q_edges were given,
+            'quantiles' (first axis: one per quantile). arrays have the grid
+            shape for a dense grid; for a sparse grid, one element per
+            non-empty cell, and 'index' gives the cell index per dimension.
+        """
+        n = self._n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self._m2 / (n-ddof))
+        std[n-ddof <= 0] = np.nan
+        result = {'count': n, 'mean': np.where(n > 0, self._mean, np.nan), 'std': std}
+        if self._hist is not None:
+            result['quantiles'] = self._quantiles(quantiles)
+
+        if self.sparse:
+            result['index'] = np.unravel_index(self._keys, self.shape)
+        else:
+            for k in ('count', 'mean', 'std'):
+                result[k] = result[k].reshape(self.shape)
+            if 'quantiles' in result:
+                result['quantiles'] = result['quantiles'].reshape((len(quantiles),)+self.shape)
+        return result
+
+    def to_frame(self, ddof=0, quantiles=(0.25, 0.5, 0.75)):
+        """
+        statistics of all non-empty cells as pandas DataFrame, with the bin
+        centres of each dimension as columns.
+        """
+        stats = self.statistics(ddof=ddof, quantiles=quantiles)
+        index = (stats['index'] if self.sparse else
+                 np.unravel_index(np.arange(self.n_cells), self.shape))
+        filled = self._n > 0
+        df = pd.DataFrame({name: c[ix][filled] for name, c, ix in
+                           zip(self.names, self.centres, index)})
+        for k in ('count', 'mean', 'std'):
+            df[k] = stats[k].reshape(-1)[filled]
+        for q, values in zip(quantiles, stats.get('quantiles', ())):
+            df[f"q{q:g}"] = values.reshape(-1)[filled]
+        return df
+
+
+def bin_nd(coords, v, edges, vmiss=np.nan, q_edges=None, sparse=False, names=None):
+    """
+    bin v on an N-dimensional grid in a single pass, see NDBinGrid.
+    returns:
+        NDBinGrid (use .statistics() or .to_frame(); .merge() to combine
+        grids of e.g. several flights)
+    """
+    return NDBinGrid(edges, q_edges=q_edges, sparse=sparse, names=names).add(coords, v, vmiss=vmiss)
+
+
+###############################################################################
+
+
+@nu.njit
+def _segment_quantiles(v, starts, lengths, quantiles, interpolate, out, mad, n):
+    """
+    exact quantiles and MAD of the finite values of each segment; each
+    segment is sorted separately. interpolate: linear interpolation between
+    ranks (as np.quantile), otherwise the value of rank floor(q*(n-1)) (as
+    np.quantile(..., method='lower')); also for the medians of the MAD.
+    """
+    for k in range(starts.size):
+        x = v[starts[k]:starts[k]+lengths[k]]
+        x = np.sort(x[np.isfinite(x)])
+        n[k] = x.size
+        if x.size == 0:
+            out[:, k], mad[k] = np.nan, np.nan
+            continue
+        for j in range(quantiles.size):
+            pos = quantiles[j]*(x.size-1)
+            lo = int(np.floor(pos))
+            hi = min(lo+1, x.size-1)
+            out[j, k] = x[lo] + (pos-lo)*(x[hi]-x[lo]) if interpolate else x[lo]
+        if interpolate:
+            mad[k] = np.median(np.abs(x - np.median(x)))
+        else:
+            dev = np.sort(np.abs(x - x[(x.size-1)//2]))
+            mad[k] = dev[(x.size-1)//2]
+
+
+class QuantileSketch:
+    """
+    mergeable quantile sketch for many bins at once, with bounded memory per
+    bin (DDSketch-like: logarithmic buckets with relative accuracy rel_acc;
+    if a bin has more than max_buckets buckets, the lowest are collapsed).
+    data can be added in chunks; sketches of e.g. different files can be
+    merged.
+
+    inputs:
+        rel_acc: relative accuracy of the quantiles (e.g. 0.01 = 1 %).
+        max_buckets: maximum number of buckets per bin.
+        min_value: values with a magnitude below min_value are treated as 0.
+    """
+    _K = 2**21 # bucket index range per bin
+
+    def __init__(self, rel_acc=0.01, max_buckets=2048, min_value=1e-9):
+        self.rel_acc, self.max_buckets, self.min_value = rel_acc, max_buckets, min_value
+        self._gamma = (1+rel_acc) / (1-rel_acc)
+        self._kmin = np.ceil(np.log(min_value) / np.log(self._gamma))
+        self._keys = np.empty(0, dtype=np.int64) # bin*_K + bucket index
+        self._counts = np.empty(0, dtype=np.int64)
+
+    def _bucket_index(self, v):
+        """
+        signed bucket index, increasing with v; 0 for |v| < min_value.
+        """
+        mag = np.abs(v)
+        with np.errstate(divide='ignore'):
+            k = np.ceil(np.log(np.maximum(mag, self.min_value)) / np.log(self._gamma))
+        ix = np.where(mag < self.min_value, 0, k - self._kmin + 1).astype(np.int64)
+        if ix.max(initial=0) >= self._K//2:
+            raise ValueError('values too large for min_value and rel_acc.')
+        return np.sign(v).astype(np.int64)*ix
+
+    def _bucket_value(self, ix):
+        """
+        representative value of the buckets ix.
+        """
+        k = np.abs(ix) + self._kmin - 1
+        return np.where(ix == 0, 0., np.sign(ix)*2*self._gamma**k/(self._gamma+1))
+
+    def _combine(self, keys, counts):
+        keys, inv = np.unique(np.concatenate((self._keys, keys)), return_inverse=True)
+        counts = np.bincount(inv, weights=np.concatenate((self._counts, counts))).astype(np.int64)
+
+        # collapse the lowest buckets of bins with more than max_buckets:
+        bins = keys // self._K
+        ends = np.append(np.flatnonzero(bins[1:] != bins[:-1])+1, keys.size)
+        n_buckets = np.diff(np.append(0, ends))
+        if np.any(n_buckets > self.max_buckets):
+            end_of = np.repeat(ends, n_buckets)
+            rank_from_top = end_of - 1 - np.arange(keys.size)
+            collapse = rank_from_top >= self.max_buckets
+            keys = keys.copy()
+            keys[collapse] = keys[(end_of - self.max_buckets)[collapse]]
+            keys, inv = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inv, weights=counts).astype(np.int64)
+
+        self._keys, self._counts = keys, counts
+
+    def add(self, bins, v):
+        """
+        add values v (NaN / INF are ignored) with bin numbers bins (int >= 0,
+        e.g. 'bins' of bin_time). returns self.
+        """
+        bins, v = np.asarray(bins, dtype=np.int64), np.asarray(v, dtype=np.float64)
+        valid = np.isfinite(v)
+        keys = bins[valid]*self._K + self._bucket_index(v[valid]) + self._K//2
+        keys, counts = np.unique(keys, return_counts=True)
+        self._combine(keys, counts)
+        return self
+
+    def merge(self, other):
+        """
+        merge a sketch with the same rel_acc and min_value. returns self.
+        """
+        if (other.rel_acc, other.min_value) != (self.rel_acc, self.min_value):
+            raise ValueError('sketches must have the same rel_acc and min_value.')
+        self._combine(other._keys, other._counts)
+        return self
+
+    def statistics(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """
+        quantiles per bin, i.e. the value of rank floor(q*(n-1)) with
+        relative error <= rel_acc (unless buckets were collapsed; no
+        interpolation between values), median, IQR and MAD (median absolute
+        deviation from the median, from the bucket values).
+        returns:
+            dict with 'bins', 'count', 'quantiles' (first axis: one per
+            quantile), 'median', 'iqr', 'mad'.
+        """
+        bins = self._keys // self._K
+        values = self._bucket_value(self._keys % self._K - self._K//2)
+        starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+        ubins = bins[starts]
+        seg_ix = np.repeat(np.arange(starts.size), np.diff(np.append(starts, bins.size)))
+        n = np.add.reduceat(self._counts, starts)
+        cum = np.cumsum(self._counts)
+
+        def _weighted_quantile(cum, q):
+            # first bucket in each bin with cumulative count > q*(n-1)
+            target = np.concatenate(([0], cum))[starts] + q*(n-1)
+            return np.searchsorted(cum, target, side='right')
+
+        def _quantile(q):
+            return values[_weighted_quantile(cum, q)]
+
+        result = {'bins': ubins, 'count': n,
+                  'quantiles': np.array([_quantile(q) for q in quantiles]).reshape(len(quantiles), -1),
+                  'median': _quantile(0.5),
+                  'iqr': _quantile(0.75) - _quantile(0.25)}
+
+        # MAD: weighted median of |bucket value - median|
+        dev = np.abs(values - result['median'][seg_ix])
+        order = np.lexsort((dev, seg_ix))
+        cum_dev = np.cumsum(self._counts[order])
+        result['mad'] = dev[order][_weighted_quantile(cum_dev, 0.5)]
+        return result
+
+
+def bin_quantiles_y_of_t(v, bin_info,
+                         vmiss=np.nan,
+                         quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+                         method='exact',
+                         rel_acc=0.01,
+                         chunksize=10**7,
+                         interpolation='linear'):
+    """
+    quantiles, median, IQR and MAD per bin, using the output of function
+    "bin_time", "bin_time_10s" or "resample_time".
+    the q-quantile of the n sorted values x[0] ... x[n-1] of a bin is
+        interpolation='linear': x[i] + (p-i)*(x[i+1]-x[i]), p = q*(n-1),
+                                i = floor(p) (as np.quantile)
+        interpolation='lower': x[floor(q*(n-1))], i.e. rank-based without
+                               interpolation (np.quantile(method='lower'))
+    the sketch is always rank-based ('lower'; each value within rel_acc).
+    in small bins, the two definitions can differ by up to the spacing of
+    neighbouring values, e.g. median of [1, 10]: 5.5 ('linear') vs. 1.
+    inputs:
+        v: np.ndarray, variable to bin.
+        bin_info: see above.
+        vmiss: missing value indicator, ignored.
+        quantiles: quantiles to compute (0-1).
+        method: 'exact' (sort-based) or 'sketch' (QuantileSketch, relative
+                accuracy rel_acc; v is added in chunks of chunksize, so
+                memory is bounded).
+        interpolation: 'linear' or 'lower', see above. only for 'exact';
+                       use 'lower' to compare with 'sketch'.
+    returns:
+        dict with 'quantiles' (first axis: one per quantile), 'median',
+        'iqr', 'mad' (not scaled to sigma) and 'count', one element per bin
+        (same length as output of bin_y_of_t).
+    """
+    if method not in ('exact', 'sketch'):
+        raise ValueError(f"invalid method '{method}'")
+    if interpolation not in ('linear', 'lower'):
+        raise ValueError(f"invalid interpolation '{interpolation}'")
+    quantiles = tuple(quantiles)
+
+    if method == 'exact':
+        _v = v.astype(np.float64)
+        _v[v == vmiss] = np.nan
+        if bin_info.get('mask') is not None and bin_info['mask'].size:
+            _v[~bin_info['mask']] = np.nan
+        seg = _bin_segments(bin_info['bins'])
+        if seg['order'] is not None:
+            _v = _v[seg['order']]
+        starts, n_seg = seg['starts'], seg['starts'].size
+        qs = np.empty((len(quantiles)+3, n_seg))
+        mad, n = np.empty(n_seg), np.empty(n_seg, dtype=np.int64)
+        _segment_quantiles(_v, starts, seg['lengths'],
+                           np.array(quantiles+(0.25, 0.5, 0.75), dtype=np.float64),
+                           interpolation == 'linear', qs, mad, n)
+        result = {'quantiles': qs[:-3], 'median': qs[-2], 'iqr': qs[-1]-qs[-3],
+                  'mad': mad, 'count': n}
+    else:
+        bins, mask = bin_info['bins'], bin_info.get('mask')
+        ubins = np.unique(bins)
+        sketch = QuantileSketch(rel_acc=rel_acc)
+        for i in range(0, v.size, chunksize):
+            _v = v[i:i+chunksize].astype(np.float64)
+            _v[v[i:i+chunksize] == vmiss] = np.nan # compare in the dtype of v
+            if mask is not None and mask.size:
+                _v[~mask[i:i+chunksize]] = np.nan
+            sketch.add(bins[i:i+chunksize] - ubins[0], _v)
+        stats = sketch.statistics(quantiles+(0.25, 0.75))
+        ix = np.searchsorted(ubins, stats.pop('bins') + ubins[0])
+        result = {}
+        for k in ('quantiles', 'median', 'iqr', 'mad', 'count'):
+            a = stats[k][:len(quantiles)] if k == 'quantiles' else stats[k]
+            full = np.full(a.shape[:-1]+(ubins.size,), 0 if k == 'count' else np.nan,
+                           dtype=a.dtype)
+            full[..., ix] = a
+            result[k] = full
+
+    for k in result:
+        if bin_info['cut_first']:
+            result[k] = result[k][..., 1:]
+        if bin_info['cut_last']:
+            result[k] = result[k][..., :-1]
+
     return result
 
 
 ###############################################################################
 
 
+def _xvar_range(x0, x1, dx, to_closest, apply_round):
+    """
+    first and last bin middle for bin_info_xvar / bin_info_xvar_np.
+    """
+    xmin, xmax = x0, x1
+    if to_closest and dx == 10:
+        if apply_round:
+            x0, xmin = round(x0), round(xmin)
+            x1, xmax = round(x1), round(xmax)
+        if (to_closest - (x0 % dx)) < 0:  # x0 greater "to_closest"
+            xmin = x0 + (to_closest - (x0 % dx)) + dx
+        if (to_closest - (x0 % dx)) > 0:  # x0 smaller "to_closest"
+            xmin = x0 + (to_closest - (x0 % dx))
+        if (to_closest - (x1 % dx)) < 0:  # x1 greater "to_closest"
+            xmax = x1 + (to_closest - (x1 % dx))
+        if (to_closest - (x1 % dx)) > 0:  # x1 smaller "to_closest"
+            xmax = x1 + (to_closest - (x1 % dx) - dx)
+    return xmin, xmax
+
+
 def bin_info_xvar(xvar, dx,
                   to_closest=False, apply_round=True,
                   output='float', outfmt="%.2f"):
@@ -330,21 +1475,7 @@ def bin_info_xvar(xvar, dx,
     if not strictly_increasing(xvar):
         raise ValueError("xvar must be strictly increasing")
 
-    x0, xmin = xvar[0], xvar[0]
-    x1, xmax = xvar[-1], xvar[-1]
-
-    if to_closest and dx == 10:
-        if apply_round:
-            x0, xmin = round(x0), round(xmin)
-            x1, xmax = round(x1), round(xmax)
-        if (to_closest - (x0 % dx)) < 0:  # x0 greater "to_closest"
-            xmin = x0 + (to_closest - (x0 % dx)) + dx
-        if (to_closest - (x0 % dx)) > 0:  # x0 smaller "to_closest"
-            xmin = x0 + (to_closest - (x0 % dx))
-        if (to_closest - (x1 % dx)) < 0:  # x1 greater "to_closest"
-            xmax = x1 + (to_closest - (x1 % dx))
-        if (to_closest - (x1 % dx)) > 0:  # x1 smaller "to_closest"
-            xmax = x1 + (to_closest - (x1 % dx) - dx)
+    xmin, xmax = _xvar_range(xvar[0], xvar[-1], dx, to_closest, apply_round)
 
     bin_info = {}
     bin_info['nbins'] = floor((xmax-xmin)/dx) + 1
@@ -460,6 +1591,106 @@ def bin_yvar(v, bin_info,
 ###############################################################################
 
 
+def bin_info_xvar_np(xvar, dx,
+                     to_closest=False, apply_round=True,
+                     output='float', outfmt="%.2f"):
+    """
+    numpy version of bin_info_xvar. bin k covers
+    [bins[k]-dx/2, bins[k]+dx/2); bin edges are found with np.searchsorted.
+    instead of per-bin lists of values and indices, the elements of bin k are
+    given by offsets: xvar[offsets[k]:offsets[k+1]].
+    returns:
+        dict with keys 'nbins', 'bins' (np.ndarray, of str if
+        output='string'), 'offsets' and 'n_in_bin' (np.ndarray of int)
+    """
+    xvar = np.asarray(xvar, dtype=np.float64)
+    if xvar.ndim != 1 or xvar.size == 0:
+        raise ValueError("xvar must be a non-empty 1D array")
+    if not np.all(xvar[1:] > xvar[:-1]):
+        raise ValueError("xvar must be strictly increasing")
+
+    xmin, xmax = _xvar_range(xvar[0], xvar[-1], dx, to_closest, apply_round)
+
+    nbins = floor((xmax-xmin)/dx) + 1
+    bins = xmin + np.arange(nbins)*dx
+    offsets = np.searchsorted(xvar, np.append(bins-dx/2, bins[-1]+dx/2), side='left')
+
+    return {'nbins': nbins,
+            'bins': np.char.mod(outfmt, bins) if output == 'string' else bins,
+            'offsets': offsets,
+            'n_in_bin': np.diff(offsets)}
+
+
+@nu.njit
+def _bin_yvar_kernel(v, offsets, no_val, exclude_noval, calc_stat, mode, out):
+    """
+    mean, median and standard deviation (rows of out, prefilled with no_val)
+    per bin, see bin_yvar. mode: 0 arithmetic, 1 degrees, 2 day fraction.
+    """
+    for k in range(offsets.size-1):
+        a, b = offsets[k], offsets[k+1]
+        if b - a == 1: # bin contains only 1 value
+            out[0, k] = v[a]
+        if b - a < 2 or not calc_stat:
+            continue
+        seg = v[a:b]
+        if exclude_noval:
+            seg = seg[seg != no_val]
+        if seg.size < 2:
+            continue
+        if mode == 0:
+            out[0, k] = seg.mean()
+            out[1, k] = np.median(seg)
+            out[2, k] = np.sqrt(np.sum((seg-out[0, k])**2)/(seg.size-1))
+        else:
+            rad = np.radians(seg*360. if mode == 2 else seg)
+            deg = np.degrees(np.arctan2(np.sin(rad).sum(), np.cos(rad).sum()))
+            if mode == 2:
+                deg = (deg + 360. if deg < 0 else deg) / 360.
+            out[0, k] = deg
+
+
+def bin_yvar_np(v, bin_info,
+                no_val=999999,
+                v_is_dayfrac=False,
+                v_is_deg=False,
+                calc_stat=True,
+                output='float', outfmt="%.2f",
+                exclude_noval=False):
+    """
+    numpy version of bin_yvar; apply bin_info_xvar_np output to bin a
+    variable. same statistics as bin_yvar (stdev with ddof=1, no median and
+    stdev for angles and day fractions, no_val for bins with less than two
+    values) but no per-bin lists of values; use
+    v[offsets[k]:offsets[k+1]] instead.
+    returns:
+        dict with keys 'bin_mean', 'bin_median', 'bin_stddev' (np.ndarray;
+        'bin_mean' of str if output='string')
+    """
+    if v_is_dayfrac and v_is_deg:
+        raise ValueError("v can either be day fraction or degrees, not both")
+    v = np.asarray(v, dtype=np.float64)
+    offsets = bin_info['offsets']
+    if offsets[-1] > v.size:
+        raise ValueError("v is shorter than xvar used for bin_info")
+
+    out = np.full((3, offsets.size-1), no_val, dtype=np.float64)
+    _bin_yvar_kernel(v, offsets, float(no_val), exclude_noval, calc_stat,
+                     2 if v_is_dayfrac else 1 if v_is_deg else 0, out)
+
+    binned_var = {'bin_mean': out[0], 'bin_median': out[1], 'bin_stddev': out[2]}
+    if output == 'string':
+        means = np.char.mod(outfmt, out[0])
+        if exclude_noval:
+            means[out[0] == no_val] = str(int(no_val))
+        binned_var['bin_mean'] = means
+
+    return binned_var
+
+
+###############################################################################
+
+
 def bin_by_npreduceat(v: np.ndarray, nbins: int,
                       ignore_nan=True):
     """
@@ -484,6 +1715,105 @@ def bin_by_npreduceat(v: np.ndarray, nbins: int,
     return out
 
 
+def _weighted_reduceat(v, starts, unc=None, weights=None, ignore_nan=True):
+    """
+    weighted mean, propagated uncertainty, number of elements and effective
+    number of elements (Kish, (sum w)^2 / sum w^2) for the blocks of v
+    starting at starts, with np.add.reduceat.
+    """
+    v = np.asarray(v, dtype=np.float64)
+    if unc is None and weights is None:
+        raise ValueError('specify unc and / or weights.')
+    if unc is not None:
+        unc = np.asarray(unc, dtype=np.float64)
+        if unc.shape != v.shape:
+            raise ValueError('unc must have the same shape as v.')
+    if weights is None:
+        with np.errstate(divide='ignore'):
+            weights = 1/unc**2 # inverse-variance weights
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != v.shape:
+        raise ValueError('weights must have the same shape as v.')
+
+    lengths = np.diff(np.append(starts, v.size))
+    if ignore_nan:
+        valid = np.isfinite(v) & np.isfinite(weights)
+        if unc is not None:
+            valid &= np.isfinite(unc)
+        w = np.where(valid, weights, 0.)
+        v, unc = np.where(valid, v, 0.), (None if unc is None else np.where(valid, unc, 0.))
+        n = np.add.reduceat(valid, starts)
+    else: # NaN propagates to the whole block
+        w = weights
+        n = lengths
+
+    sum_w = np.add.reduceat(w, starts)
+    sum_w2 = np.add.reduceat(w*w, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = {'mean': np.add.reduceat(w*v, starts) / sum_w,
+                  'unc': (np.full(starts.size, np.nan) if unc is None else
+                          np.sqrt(np.add.reduceat(w*w*unc*unc, starts)) / sum_w),
+                  'n': n,
+                  'n_eff': sum_w*sum_w / sum_w2}
+    return result
+
+
+def bin_by_npreduceat_weighted(v, nbins, unc=None, weights=None,
+                               ignore_nan=True):
+    """
+    weighted version of bin_by_npreduceat (same blocks).
+    inputs:
+        v: 1D array.
+        nbins: number of blocks.
+        unc: uncertainty (1 sigma) of each element of v. if weights are not
+             given, inverse-variance weights 1/unc**2 are used.
+        weights: weight of each element (alternative to or together with
+                 unc).
+        ignore_nan: ignore elements where v, unc or weights are NaN or INF
+                    (e.g. unc=0, infinite weight). if False, the whole block
+                    is NaN if it contains one of those.
+    returns:
+        dict with 'mean' (weighted mean), 'unc' (propagated uncertainty of
+        the mean, sqrt(sum w^2 unc^2) / sum w, equals 1/sqrt(sum w) for
+        inverse-variance weights; NaN without unc), 'n' (number of elements
+        used) and 'n_eff' (effective number of elements, (sum w)^2 / sum w^2)
+        per block.
+    """
+    v = np.asarray(v, dtype=np.float64)
+    bins = np.linspace(0, v.size, nbins+1, True).astype(np.int64)
+    return _weighted_reduceat(v, bins[:-1], unc=unc, weights=weights, ignore_nan=ignore_nan)
+
+
+def _blocks_cut(n, bl_sz, edges):
+    """
+    start and end index of the part of a vector of length n that is divided
+    into complete blocks of size bl_sz. edges: where the remainder is cut off,
+    'cut_both', 'cut_beg' or 'cut_end'.
+    """
+    mod = n % bl_sz
+    if edges == 'cut_both':
+        return floor(mod/2), n - (mod - floor(mod/2))
+    if edges == 'cut_beg':
+        return mod, n
+    if edges == 'cut_end':
+        return 0, n - mod
+    raise ValueError(f"invalid edges '{edges}'")
+
+
+def get_blmean_weighted(v, bl_sz, unc=None, weights=None,
+                        edges='cut_both', ignore_nan=True):
+    """
+    weighted block mean with a fixed number of elements (bl_sz) per block,
+    see get_list_blmean (edges) and bin_by_npreduceat_weighted (unc,
+    weights, ignore_nan, returns).
+    """
+    v = np.asarray(v, dtype=np.float64)
+    ix0, ix1 = _blocks_cut(v.size, bl_sz, edges)
+    cut = lambda a: None if a is None else np.asarray(a, dtype=np.float64)[ix0:ix1]
+    return _weighted_reduceat(v[ix0:ix1], np.arange(0, ix1-ix0, bl_sz),
+                              unc=cut(unc), weights=cut(weights), ignore_nan=ignore_nan)
+
+
 ###############################################################################
 
 
@@ -537,6 +1867,42 @@ def get_list_blmean(vector, bl_sz, edges='cut_both', output='float',
         return result
 
 
+def get_np_blmean(v, bl_sz, edges='cut_both', output='float',
+                  outfmt="%.2f"):
+    """
+    numpy version of get_list_blmean for float and datetime64 arrays
+    (lists are converted; datetime.datetime to datetime64[us]). the
+    remainder len(v) % bl_sz is cut off according to edges, then the mean
+    of each block is computed with reshape and mean.
+    note: 'cut_beg' removes the remainder from the beginning, 'cut_end'
+    from the end.
+    returns:
+        np.ndarray; datetime64 (same unit) for datetime input, float, int
+        (truncated) or str (outfmt) depending on output otherwise.
+    """
+    v = np.asarray(v)
+    if v.dtype == object and v.size and isinstance(v[0], date):
+        v = v.astype('datetime64[us]')
+    ix0, ix1 = _blocks_cut(v.size, bl_sz, edges)
+    v = v[ix0:ix1]
+
+    if np.issubdtype(v.dtype, np.datetime64):
+        if v.size == 0:
+            return v
+        # mean of offsets from the first element as int; avoids overflow
+        base = v[0]
+        delta = v - base
+        offsets = delta.view(np.int64).reshape(-1, bl_sz)
+        return base + np.rint(offsets.mean(axis=1)).astype(np.int64).view(delta.dtype)
+
+    result = v.astype(np.float64).reshape(-1, bl_sz).mean(axis=1)
+    if output == 'string':
+        return np.char.mod(outfmt, result)
+    if output == 'int':
+        return result.astype(np.int64)
+    return result
+
+
 ###############################################################################
 
 
@@ -607,3 +1973,230 @@ def pd_mvg_avg(v, N, ip_gaps=False, min_periods=1):
 
 
 ###############################################################################
+
+
+@nu.njit
+def _rolling_moments(v, N, shift, min_periods, stat, ddof, out):
+    """
+    rolling sum (stat 0), mean (1) or std (2) in one pass; each element is
+    added to and removed from running sums once (Kahan-compensated sum,
+    Welford for the variance). non-finite elements are skipped.
+    """
+    n = v.size
+    cnt, s, comp, mean, m2 = 0, 0., 0., 0., 0.
+    i_add, i_rem = 0, 0
+    for i in range(n):
+        while i_add <= min(i+shift, n-1): # add elements entering the window
+            x = v[i_add]
+            i_add += 1
+            if not np.isfinite(x):
+                continue
+            cnt += 1
+            y = x - comp
+            t = s + y
+            comp = (t - s) - y
+            s = t
+            delta = x - mean
+            mean += delta/cnt
+            m2 += delta*(x - mean)
+        while i_rem < i - N + 1 + shift: # remove elements leaving the window
+            x = v[i_rem]
+            i_rem += 1
+            if not np.isfinite(x):
+                continue
+            cnt -= 1
+            if cnt == 0: # reset, avoids accumulating rounding errors
+                s, comp, mean, m2 = 0., 0., 0., 0.
+                continue
+            y = -x - comp
+            t = s + y
+            comp = (t - s) - y
+            s = t
+            delta = x - mean
+            mean -= delta/cnt
+            m2 = max(m2 - delta*(x - mean), 0.)
+
+        if cnt < min_periods or cnt == 0:
+            out[i] = np.nan
+        elif stat == 0:
+            out[i] = s
+        elif stat == 1:
+            out[i] = s/cnt
+        else:
+            out[i] = np.sqrt(m2/(cnt-ddof)) if cnt > ddof else np.nan
+
+
+@nu.njit
+def _rolling_minmax(v, N, shift, min_periods, sign, out):
+    """
+    rolling max (sign 1) or min (sign -1) with a monotonic deque of indices;
+    each element is pushed and popped at most once. non-finite elements are
+    skipped.
+    """
+    n = v.size
+    dq = np.empty(n, dtype=np.int64)
+    head, tail, cnt = 0, 0, 0
+    i_add, i_rem = 0, 0
+    for i in range(n):
+        while i_add <= min(i+shift, n-1):
+            x = v[i_add]
+            if np.isfinite(x):
+                cnt += 1
+                while tail > head and sign*v[dq[tail-1]] <= sign*x:
+                    tail -= 1
+                dq[tail] = i_add
+                tail += 1
+            i_add += 1
+        lo = i - N + 1 + shift
+        while i_rem < lo:
+            if np.isfinite(v[i_rem]):
+                cnt -= 1
+            i_rem += 1
+        while head < tail and dq[head] < lo:
+            head += 1
+        out[i] = v[dq[head]] if (cnt >= min_periods and head < tail) else np.nan
+
+
+def nb_rolling(v, N, stat='mean', center=True, min_periods=1, ddof=1):
+    """
+    rolling window statistics in O(n), independent of the window size N
+    (numba). NaN / INF are skipped (windows with less than min_periods
+    finite values give NaN), as in pd_mvg_avg.
+    inputs:
+        v: 1D array.
+        N: window size (number of elements).
+        stat: 'mean', 'sum', 'std', 'min' or 'max'.
+        center: centered window (as pandas rolling(center=True)); trailing
+                window (element and N-1 preceding elements) if False.
+        min_periods: minimum number of finite values in window.
+        ddof: delta degrees of freedom for 'std'.
+    returns:
+        np.ndarray (float), same length as v.
+    """
+    N, min_periods = int(N), max(int(min_periods), 1)
+    if N < 1:
+        raise ValueError('N must be >= 1.')
+    v = np.ascontiguousarray(v, dtype=np.float64)
+    out = np.empty(v.size, dtype=np.float64)
+    shift = (N-1)//2 if center else 0
+
+    moments = {'sum': 0, 'mean': 1, 'std': 2}
+    if stat in moments:
+        _rolling_moments(v, N, shift, min_periods, moments[stat], ddof, out)
+    elif stat in ('min', 'max'):
+        _rolling_minmax(v, N, shift, min_periods, 1. if stat == 'max' else -1., out)
+    else:
+        raise ValueError(f"invalid stat '{stat}'")
+
+    return out
+
+
+###############################################################################
+
+
+if __name__ == '__main__':
+    # examples / self-checks; benchmarks: see averaging_binning_benchmarks.py
+    rng = np.random.default_rng(42)
+    t = np.arange(10_000, dtype=np.float64)
+    bin_info = bin_time_10s(t)
+
+    # bin_y_of_t: numba kernel vs. numpy path, with vmiss, for float32 / float64 / int
+    for dtype, vmiss in ((np.float32, 99999.999), (np.float64, 99999.999), (np.int32, 99999)):
+        v = rng.normal(100, 10, t.size).astype(dtype)
+        v[::7] = vmiss
+        assert np.allclose(bin_y_of_t(v, bin_info, vmiss=vmiss),
+                           bin_y_of_t(v, bin_info, vmiss=vmiss, use_numba=False))
+
+    # bin_stats_y_of_t and bin_y_of_t_multi vs. bin_y_of_t
+    V = rng.normal(100, 10, (t.size, 3))
+    V[::17, 0] = np.nan
+    stats = bin_stats_y_of_t(V[:, 0], bin_info)
+    assert np.allclose(stats['mean'], bin_y_of_t(V[:, 0], bin_info), equal_nan=True)
+    multi = bin_y_of_t_multi(V, bin_info)
+    assert all(np.allclose(multi[:, j], bin_y_of_t(V[:, j], bin_info), equal_nan=True)
+               for j in range(3))
+    V32 = V.astype(np.float32)
+    V32[::3] = 99999.999
+    multi = bin_y_of_t_multi(V32, bin_info, vmiss=99999.999)
+    assert all(np.allclose(multi[:, j], bin_y_of_t(V32[:, j], bin_info, vmiss=99999.999),
+                           equal_nan=True) for j in range(3))
+
+    # grouped circular means vs. mean_angle per group
+    deg = rng.uniform(-180, 180, 1000)
+    groups = np.repeat(np.arange(10), 100)
+    assert np.allclose(mean_angle_grouped(deg, groups)[1],
+                       [mean_angle(deg[groups == g]) for g in range(10)])
+
+    # bin_yvar_np vs. bin_yvar
+    x = np.cumsum(rng.uniform(0.5, 1.5, 1000))
+    v = rng.normal(100, 10, x.size)
+    binned = bin_yvar_np(v, bin_info_xvar_np(x, 10))
+    binned_list = bin_yvar(list(v), bin_info_xvar(list(x), 10))
+    assert all(np.allclose(binned[k], binned_list[k])
+               for k in ('bin_mean', 'bin_median', 'bin_stddev'))
+
+    # OnlineBinner in chunks vs. batch; edge bins with / without force_t_range
+    t_e, v = np.arange(7., 3007.), rng.normal(100, 10, 3000)
+    for force_t_range in (True, False):
+        binner = OnlineBinner(10, force_t_range=force_t_range)
+        res = [binner.update(t_e[i:i+33], v[i:i+33]) for i in range(0, t_e.size, 33)]
+        res.append(binner.flush())
+        ref = bin_time_10s(t_e, force_t_range=force_t_range)
+        assert np.allclose(np.concatenate([r['mean'] for r in res]),
+                           bin_stats_y_of_t(v, ref, stats=('mean',))['mean'])
+
+    # float32 data with vmiss
+    v32 = rng.normal(100, 10, t_e.size).astype(np.float32)
+    v32[::3] = 99999.999
+    binner = OnlineBinner(10, vmiss=99999.999)
+    res = [binner.update(t_e[i:i+33], v32[i:i+33]) for i in range(0, t_e.size, 33)]
+    res.append(binner.flush())
+    assert np.allclose(np.concatenate([r['mean'] for r in res]),
+                       bin_y_of_t(v32, bin_time_10s(t_e, force_t_range=False), vmiss=99999.999))
+
+    # advance completes a bin that is only known to be the last one at flush
+    t_a = np.array([1., 2., 3., 12., 13., 14., 22., 27.])
+    binner = OnlineBinner(10, force_t_range=True)
+    res = [binner.update(t_a[:3], t_a[:3]), binner.advance(10.5),
+           binner.update(t_a[3:], t_a[3:]), binner.flush()]
+    assert np.array_equal(np.concatenate([r['t_binned'] for r in res]),
+                          bin_time_10s(t_a)['t_binned'])
+
+    # resample_time vs. bin_time_10s, with / without force_t_range
+    for force_t_range in (True, False):
+        assert np.allclose(bin_y_of_t(v, resample_time(t_e, 10, force_t_range=force_t_range)),
+                           bin_y_of_t(v, bin_time_10s(t_e, force_t_range=force_t_range)))
+
+    # N-dimensional binning: latitude x altitude
+    coords = [rng.uniform(-90, 90, 1000), rng.uniform(0, 14, 1000)]
+    grid = bin_nd(coords, rng.normal(400, 20, 1000),
+                  [np.arange(-90, 91, 30), np.arange(0, 15, 7)])
+    print(grid.to_frame())
+    v32 = rng.normal(400, 20, 1000).astype(np.float32)
+    v32[::2] = 99999.999
+    grid = bin_nd(coords, v32, [np.arange(-90, 91, 30), np.arange(0, 15, 7)], vmiss=99999.999)
+    assert grid.statistics()['count'].sum() == 500
+
+    # weighted block means
+    print(get_blmean_weighted(rng.normal(100, 10, 100), 10, unc=np.full(100, 2.)))
+
+    # block mean of datetime64 vs. list of datetime
+    t_list = [datetime(2020, 1, 1, 0, 0, i) for i in range(60)]
+    assert (get_np_blmean(np.array(t_list, dtype='datetime64[us]'), 10).astype(datetime).tolist()
+            == get_list_blmean(t_list, 10))
+
+    # rolling mean vs. pandas
+    v = rng.normal(100, 10, 1000)
+    v[::13] = np.nan
+    assert np.allclose(nb_rolling(v, 10),
+                       pd.Series(v).rolling(10, center=True, min_periods=1).mean(),
+                       equal_nan=True)
+
+    # quantiles per bin: exact ('lower') and sketch agree within rel_acc,
+    # also with float32 data and vmiss
+    v = rng.lognormal(3, 1, t.size).astype(np.float32)
+    v[::3] = 99999.999
+    q_exact = bin_quantiles_y_of_t(v, bin_info, vmiss=99999.999, interpolation='lower')
+    q_sketch = bin_quantiles_y_of_t(v, bin_info, vmiss=99999.999, method='sketch')
+    assert np.array_equal(q_sketch['count'], q_exact['count'])
+    assert np.allclose(q_sketch['quantiles'], q_exact['quantiles'], rtol=0.01, atol=0)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+r"""
+Created on Sat Oct 17 18:40:12 2026
+
+@author: F. Obersteiner, florian\obersteiner\\kit\edu
+
+benchmarks for averaging_binning: binning, grouped circular means, streaming
+and N-d binning, block means, rolling windows, resampling and quantiles.
+run as script; takes a few minutes and about 1 GB of memory.
+"""
+import timeit
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from averaging_binning import (bin_time, bin_time_10s, resample_time,
+                               bin_y_of_t, bin_stats_y_of_t, bin_y_of_t_multi,
+                               mean_angle, mean_angle_grouped,
+                               bin_info_xvar, bin_yvar, bin_info_xvar_np, bin_yvar_np,
+                               OnlineBinner, bin_nd, bin_quantiles_y_of_t,
+                               get_list_blmean, get_np_blmean,
+                               nb_rolling, np_mvg_avg, pd_mvg_avg)
+
+
+if __name__ == '__main__':
+    # benchmark: bin_y_of_t vs. bin_stats_y_of_t, scaling with data length
+    # (1 Hz data binned to 10 s) and with number of bins (fixed data length)
+    rng = np.random.default_rng(42)
+    print("n\tbinwidth\tbin_y_of_t [s]\tbin_stats_y_of_t mean [s]\tall stats [s]")
+    for n, binwidth in ((10**4, 10), (10**5, 10), (10**6, 10), (10**7, 10),
+                        (10**5, 100), (10**5, 1000)):
+        t = np.arange(n, dtype=np.float64)
+        v = rng.normal(100, 10, n)
+        v[::17] = np.nan
+        bin_info = bin_time(t, binwidth, t_binned=np.arange(binwidth/2, n, binwidth))
+        bin_y_of_t(v, bin_info) # compile
+        dt_loop = f"{min(timeit.repeat(lambda: bin_y_of_t(v, bin_info), number=1, repeat=3)):.4f}"
+        dt_mean = min(timeit.repeat(lambda: bin_stats_y_of_t(v, bin_info, stats=('mean',)),
+                                    number=1, repeat=3))
+        dt_all = min(timeit.repeat(lambda: bin_stats_y_of_t(v, bin_info), number=1, repeat=3))
+        print(f"{n}\t{binwidth}\t{dt_loop}\t{dt_mean:.4f}\t{dt_all:.4f}")
+
+    # benchmark: 100 variables, one call per variable vs. bin_y_of_t_multi
+    n, n_vars = 10**5, 100
+    t = np.arange(n, dtype=np.float64)
+    V = rng.normal(100, 10, (n, n_vars))
+    bin_info = bin_time(t, 10, t_binned=np.arange(5, n, 10))
+    dt_single = min(timeit.repeat(lambda: [bin_stats_y_of_t(V[:, j], bin_info, stats=('mean',))
+                                           for j in range(n_vars)], number=1, repeat=3))
+    dt_multi = min(timeit.repeat(lambda: bin_y_of_t_multi(V, bin_info), number=1, repeat=3))
+    print(f"{n_vars} variables: bin_stats_y_of_t per variable {dt_single:.4f} s, "
+          f"bin_y_of_t_multi {dt_multi:.4f} s")
+
+    # benchmark: circular mean for many groups, loop vs. grouped kernels
+    n, n_groups = 10**6, 10**4
+    deg = rng.uniform(-180, 180, n)
+    groups = np.sort(rng.integers(0, n_groups, n))
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    mean_angle_grouped(deg[:10], groups[:10]) # compile
+    mean_angle_grouped(deg[:10], groups[:10], parallel=True)
+    dt_loop = min(timeit.repeat(lambda: [mean_angle(a) for a in np.split(deg, starts[1:])],
+                                number=1, repeat=3))
+    dt_seq = min(timeit.repeat(lambda: mean_angle_grouped(deg, groups), number=1, repeat=3))
+    dt_par = min(timeit.repeat(lambda: mean_angle_grouped(deg, groups, parallel=True),
+                               number=1, repeat=3))
+    print(f"mean angle, {n_groups} groups: loop {dt_loop:.4f} s, grouped {dt_seq:.4f} s, "
+          f"grouped parallel {dt_par:.4f} s")
+
+    # benchmark: bin_info_xvar / bin_yvar (lists) vs. numpy versions
+    x = np.cumsum(rng.uniform(0.5, 1.5, 10**5))
+    v = rng.normal(100, 10, x.size)
+    bin_yvar_np(v[:10], bin_info_xvar_np(x[:10], 10)) # compile
+    dt_list = min(timeit.repeat(lambda: bin_yvar(list(v), bin_info_xvar(list(x), 10)),
+                                number=1, repeat=3))
+    dt_np = min(timeit.repeat(lambda: bin_yvar_np(v, bin_info_xvar_np(x, 10)),
+                              number=1, repeat=3))
+    print(f"bin_info_xvar + bin_yvar {dt_list:.4f} s, numpy versions {dt_np:.4f} s")
+
+    # streaming: OnlineBinner with chunks of 100 elements vs. batch
+    n = 10**6
+    t = np.arange(n, dtype=np.float64)
+    v = rng.normal(100, 10, n)
+    bin_info = bin_time_10s(t)
+    def stream(chunksize=100):
+        binner = OnlineBinner(10)
+        res = [binner.update(t[i:i+chunksize], v[i:i+chunksize]) for i in range(0, n, chunksize)]
+        res.append(binner.flush())
+        return np.concatenate([r['mean'] for r in res])
+    assert np.allclose(stream(), bin_stats_y_of_t(v, bin_info, stats=('mean',))['mean'])
+    dt_stream = min(timeit.repeat(stream, number=1, repeat=3))
+    print(f"OnlineBinner, {n} elements in chunks of 100: {dt_stream:.4f} s")
+
+    # N-dimensional binning: latitude x altitude x season, 10 partial grids
+    n = 10**6
+    coords = [rng.uniform(-90, 90, n), rng.uniform(0, 14, n), rng.integers(1, 13, n)]
+    v = rng.normal(400, 20, n)
+    edges = [np.arange(-90, 91, 5), np.arange(0, 15, 0.5), np.arange(0.5, 13, 3)]
+    def grid_nd():
+        grids = [bin_nd([c[i::10] for c in coords], v[i::10], edges,
+                        q_edges=np.linspace(300, 500, 201)) for i in range(10)]
+        for g in grids[1:]:
+            grids[0].merge(g)
+        return grids[0].statistics()
+    dt_nd = min(timeit.repeat(grid_nd, number=1, repeat=3))
+    print(f"bin_nd, {n} elements, 10 partial grids with quantiles: {dt_nd:.4f} s")
+
+    # block mean of one day of 10 Hz timestamps, list vs. datetime64
+    t_list = [datetime(2020, 1, 1) + (datetime(2020, 1, 1, 0, 0, 1)-datetime(2020, 1, 1))*i/10
+              for i in range(864_000)]
+    t_np = np.array(t_list, dtype='datetime64[us]')
+    dt_list = min(timeit.repeat(lambda: get_list_blmean(t_list, 100), number=1, repeat=3))
+    dt_np = min(timeit.repeat(lambda: get_np_blmean(t_np, 100), number=1, repeat=3))
+    print(f"block mean, 864000 timestamps: get_list_blmean {dt_list:.4f} s, "
+          f"get_np_blmean {dt_np:.4f} s")
+
+    # rolling mean, window sizes 3 to 10 000: nb_rolling vs. np_mvg_avg, pd_mvg_avg
+    v = rng.normal(100, 10, 10**6)
+    nb_rolling(v[:10], 3) # compile
+    print("N\tnb_rolling [s]\tnp_mvg_avg [s]\tpd_mvg_avg [s]")
+    for N in (3, 10, 100, 1000, 10_000):
+        dts = [min(timeit.repeat(lambda: f(v, N), number=1, repeat=3))
+               for f in (nb_rolling, np_mvg_avg, pd_mvg_avg)]
+        print(f"{N}\t" + "\t".join(f"{dt:.4f}" for dt in dts))
+
+    # irregular time axis with dropouts: resample_time + bin_y_of_t
+    t = np.cumsum(rng.uniform(0.05, 0.15, 10**7))
+    t = np.delete(t, np.s_[10**6:2*10**6])
+    v = rng.normal(100, 10, t.size)
+    dt_rs = min(timeit.repeat(lambda: resample_time(t, 10, max_gap=5), number=1, repeat=3))
+    bin_info = resample_time(t, 10, max_gap=5)
+    dt_bin = min(timeit.repeat(lambda: bin_y_of_t(v, bin_info), number=1, repeat=3))
+    print(f"resample_time, {t.size} irregular elements: {dt_rs:.4f} s, bin_y_of_t {dt_bin:.4f} s")
+
+    # quantiles per bin: exact (sort-based) vs. sketch
+    n = 10**7
+    t = np.arange(n, dtype=np.float64)
+    v = rng.lognormal(3, 1, n)
+    bin_info = bin_time(t, 10, t_binned=np.arange(5, n, 10))
+    for method in ('exact', 'sketch'):
+        dt_q = min(timeit.repeat(lambda: bin_quantiles_y_of_t(v, bin_info, method=method),
+                                 number=1, repeat=3))
+        print(f"bin_quantiles_y_of_t, {n} elements, method={method}: {dt_q:.4f} s")
+
+    # memory: peak allocation of bin_y_of_t vs. size of input and output
+    n = 10**7
+    t = np.arange(n, dtype=np.float64)
+    v = rng.normal(100, 10, n)
+    bin_info = bin_time(t, 10, t_binned=np.arange(5, n, 10))
+    for use_numba in (True, False):
+        tracemalloc.start()
+        result = bin_y_of_t(v, bin_info, use_numba=use_numba)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"bin_y_of_t, use_numba={use_numba}: peak allocation {peak/1e6:.1f} MB "
+              f"(input {v.nbytes/1e6:.1f} MB, output {result.nbytes/1e6:.1f} MB)")
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+r"""
+Created on Sat Oct 17 10:12:45 2026
+
+@author: F. Obersteiner, florian\obersteiner\\kit\edu
+
+on-disk cache for NASA AMES 1001 files: the parsed header is stored as json,
+the data as binary numpy file (.npy). cache entries are identified by path,
+size and modification time of the source file, so a modified file is parsed
+again automatically.
+"""
+
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from nasa_ames_1001_read import nasa_ames_1001_read as na_r
+
+
+CACHE_SUBDIR = ".na1001_cache"
+CACHE_FILE = re.compile(r"[0-9a-f]{40}\.(json|npy)(\.tmp)?") # see _cache_key
+
+
+def _cache_key(file_path, read_kwargs):
+    """
+    hash of absolute path, size and modification time of the file, plus the
+    keywords used for parsing it.
+    """
+    stat = os.stat(file_path)
+    key = (f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|"
+           f"{sorted(read_kwargs.items())}")
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _evict_lru(cache_dir, max_cache_size, keep=()):
+    """
+    delete least recently used cache entries until the total size of the
+    cache directory is <= max_cache_size (bytes). entries in keep are not
+    deleted. the modification time of the header file marks the last access.
+    """
+    entries = []
+    for f in cache_dir.glob("*.json"):
+        npy = f.with_suffix(".npy")
+        size = f.stat().st_size + (npy.stat().st_size if npy.exists() else 0)
+        entries.append((f.stat().st_mtime, size, f.stem))
+
+    total = sum(e[1] for e in entries)
+    for _, size, key in sorted(entries): # oldest first
+        if total <= max_cache_size:
+            break
+        if key in keep:
+            continue
+        for suffix in (".json", ".npy"):
+            try:
+                os.remove(cache_dir / (key + suffix))
+            except FileNotFoundError: # e.g. removed by another process
+                pass
+        total -= size
+
+
+def na1001_read_cached(file_path, cache_dir=None,
+                       max_cache_size=2*1024**3,
+                       mmap_mode='r',
+                       **kwargs):
+    """
+    read a NASA AMES 1001 file with nasa_ames_1001_read(engine="numpy") and
+    store the result in a cache. if the file was read before and did not
+    change since, header and data are loaded from the cache, i.e. no text
+    parsing is done.
+
+    Parameters
+    ----------
+    file_path : string or pathlib Path
+        path with filename to NASA AMES 1001 formatted text file.
+    cache_dir : string or pathlib Path, optional
+        where to store cache files. The default is None, i.e. directory
+        '.na1001_cache' next to the source file. if the cache cannot be
+        written (e.g. read-only directory), the data is returned uncached.
+    max_cache_size : int, optional
+        maximum size of the cache directory in bytes. least recently used
+        entries are deleted if exceeded. The default is 2 GiB.
+    mmap_mode : str, optional
+        mmap_mode for np.load, e.g. 'r' to memory-map the data (read-only).
+        None loads the data to memory. The default is 'r'.
+    **kwargs :
+        keywords passed to nasa_ames_1001_read. engine is always "numpy".
+
+    Returns
+    -------
+    na_1001 : dict
+        as returned by nasa_ames_1001_read(engine="numpy").
+
+    """
+    kwargs['engine'] = "numpy"
+    file_path = Path(file_path)
+    cache_dir = Path(cache_dir) if cache_dir else file_path.parent / CACHE_SUBDIR
+    key = _cache_key(file_path, kwargs)
+    f_header, f_data = cache_dir / (key + ".json"), cache_dir / (key + ".npy")
+
+    if f_header.exists() and f_data.exists(): # cache hit
+        with open(f_header, "r", encoding="ASCII") as file_obj:
+            na_1001 = json.load(file_obj)
+        values = np.load(f_data, mmap_mode=mmap_mode)
+        na_1001['X'], na_1001['V'] = values[0], values[1:]
+        os.utime(f_header) # mark as recently used
+        return na_1001
+
+    na_1001 = na_r(file_path, **kwargs)
+
+    header = {k: v for k, v in na_1001.items() if k not in ('X', 'V')}
+    # write to temporary files first so that other processes never see
+    # incomplete cache entries:
+    tmp_data, tmp_header = f_data.with_suffix(".npy.tmp"), f_header.with_suffix(".json.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_data, "wb") as file_obj:
+            np.save(file_obj, np.vstack((na_1001['X'], na_1001['V'])))
+        with open(tmp_header, "w", encoding="ASCII") as file_obj:
+            json.dump(header, file_obj)
+        os.replace(tmp_data, f_data)
+        os.replace(tmp_header, f_header)
+        _evict_lru(cache_dir, max_cache_size, keep=(key,))
+    except OSError: # e.g. read-only directory or disk full; return uncached
+        incomplete = [] if f_header.exists() else [f_data]
+        for f in [tmp_data, tmp_header] + incomplete:
+            try:
+                os.remove(f)
+            except OSError:
+                pass
+
+    return na_1001
+
+
+def na1001_clear_cache(cache_dir):
+    """
+    delete all cache entries in cache_dir. only files named like a cache
+    entry (sha1 hex digest + .json / .npy, or their .tmp files) are deleted,
+    other files in cache_dir are left untouched.
+    """
+    for f in Path(cache_dir).glob("*.*"):
+        if CACHE_FILE.fullmatch(f.name):
+            os.remove(f)
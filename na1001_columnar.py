@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+r"""
+Created on Sat Oct 17 17:05:31 2026
+
+@author: F. Obersteiner, florian\obersteiner\\kit\edu
+
+export NASA AMES 1001 data to columnar binary formats (Parquet, Feather)
+and back. the complete header is stored as json in the file metadata, so
+that nasa_ames_1001_write can regenerate the text file from the binary file.
+the number format of each column is stored as well, so that the text file
+can be regenerated as it was written.
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.feather as pf
+
+from nasa_ames_1001_read import nasa_ames_1001_read as na_r
+from nasa_ames_1001_write import nasa_ames_1001_write as na_w
+from nbrs_in_stringfmt import NumStr
+
+
+META_KEY = b"na1001_header"
+DATA_FMT_KEY = b"na1001_data_fmt"
+
+_DIGITS = str.maketrans("123456789", "000000000")
+
+FORMATS = {'.parquet': 'parquet', '.pq': 'parquet',
+           '.feather': 'feather', '.arrow': 'feather'}
+
+
+def _get_fmt(file_path, fmt):
+    if fmt is None:
+        fmt = FORMATS.get(Path(file_path).suffix.lower())
+    if fmt not in ('parquet', 'feather'):
+        raise ValueError(f"unknown format for {file_path}, specify 'parquet' or 'feather'.")
+    return fmt
+
+
+def _column_names(na_1001, sep_data="\t", sep_com=";"):
+    """
+    column names for X and V; taken from the last line of NCOM if it contains
+    NV+1 unique names (CARIBIC convention), otherwise from XNAME and VNAME.
+    """
+    if na_1001['NCOM']:
+        names = na_1001['NCOM'][-1].split(sep_data)
+        if len(names) == na_1001['NV']+1 and len(set(names)) == len(names):
+            return names
+    names = [na_1001['XNAME'][0].strip()]
+    names += [n.split(sep_com)[0].strip() for n in na_1001['VNAME']]
+    if len(set(names)) != len(names):
+        names = [f"{n}_{i}" for i, n in enumerate(names)]
+    return names
+
+
+def _to_float(values, vmiss=None):
+    """
+    convert list of strings (possibly with None) or array to float array;
+    vmiss is set to NaN.
+    """
+    if not isinstance(values, np.ndarray):
+        values = [np.nan if v is None else v for v in values]
+    values = np.array(values, dtype=np.float64)
+    if vmiss is not None:
+        values[values == float(vmiss)] = np.nan
+    return values
+
+
+def _column_fmt(values, vmiss=None):
+    """
+    str.format spec of a column of number strings, e.g. '{:.2f}'. integer
+    specs are only used if all values are integers. None (i.e. str()) if the
+    column is not formatted uniformly (e.g. "1.5", "1.25") or the format is
+    unknown (e.g. float array).
+    """
+    if isinstance(values, np.ndarray):
+        return None
+    # classify by the pattern of the string, e.g. "12.50" -> "00.00"
+    patterns = Counter(v.strip().translate(_DIGITS) for v in values
+                       if v is not None and v.strip() != vmiss)
+    specs = Counter()
+    for pattern, n in patterns.items():
+        try:
+            specs[NumStr().analyse_format(pattern)[0]] += n
+        except TypeError: # e.g. nan
+            pass
+    if any(not s.endswith('d}') for s in specs):
+        specs = Counter({s: n for s, n in specs.items() if not s.endswith('d}')})
+    return specs.popitem()[0] if len(specs) == 1 else None
+
+
+def na1001_to_columnar(na_1001, out_path, fmt=None,
+                       sep_data="\t", sep_com=";",
+                       compression="zstd", data_fmt=None,
+                       **kwargs):
+    """
+    write NASA AMES 1001 data to Parquet or Feather.
+
+    Parameters
+    ----------
+    na_1001 : dict, string or pathlib Path
+        NASA AMES 1001 dict as returned by nasa_ames_1001_read, or path of the
+        NASA AMES 1001 file (read with engine="python" to keep the number
+        format of each column).
+    out_path : string or pathlib Path
+        output file.
+    fmt : string, optional
+        'parquet' or 'feather'. The default is None, i.e. derived from the
+        file extension of out_path.
+    sep_data, sep_com : string, optional
+        separators used in the NASA AMES file; used to derive column names.
+    compression : string, optional
+        compression codec, see pyarrow. The default is "zstd".
+    data_fmt : list of string, optional
+        str.format spec for X and each variable, stored in the metadata and
+        used by columnar_to_na1001_file. The default is None, i.e. derived
+        from the values if they are strings (engine="python").
+    **kwargs :
+        passed to nasa_ames_1001_read if na_1001 is a path.
+
+    Returns
+    -------
+    pyarrow.Table
+        the table that was written. values are not scaled (VSCAL), VMISS is
+        NaN.
+
+    """
+    fmt = _get_fmt(out_path, fmt)
+    if not isinstance(na_1001, dict):
+        na_1001 = na_r(na_1001, sep_data=sep_data, sep_com=sep_com,
+                       engine="python", vmiss_to_None=True, **kwargs)
+
+    header = {k: v for k, v in na_1001.items() if k not in ('X', 'V')}
+    header['DATE'], header['RDATE'] = list(header['DATE']), list(header['RDATE'])
+    names = _column_names(na_1001, sep_data=sep_data, sep_com=sep_com)
+    if data_fmt is None:
+        data_fmt = [_column_fmt(na_1001['X'])]
+        data_fmt += [_column_fmt(v, vm) for v, vm in zip(na_1001['V'], na_1001['VMISS'])]
+
+    columns = [_to_float(na_1001['X'])]
+    columns += [_to_float(v, vm) for v, vm in zip(na_1001['V'], na_1001['VMISS'])]
+
+    table = pa.table(dict(zip(names, columns)))
+    table = table.replace_schema_metadata({META_KEY: json.dumps(header).encode("ASCII"),
+                                           DATA_FMT_KEY: json.dumps(data_fmt).encode("ASCII")})
+
+    if fmt == 'parquet':
+        pq.write_table(table, out_path, compression=compression)
+    else:
+        pf.write_feather(table, out_path, compression=compression)
+
+    return table
+
+
+def _read_table(file_path, fmt=None):
+    if _get_fmt(file_path, fmt) == 'parquet':
+        table = pq.read_table(file_path, memory_map=True)
+    else:
+        table = pf.read_table(file_path, memory_map=True)
+    metadata = table.schema.metadata or {}
+    if META_KEY not in metadata:
+        raise ValueError(f"{file_path} does not contain a NASA AMES 1001 header.")
+    return table, json.loads(metadata[META_KEY])
+
+
+def columnar_to_na1001(file_path, fmt=None):
+    """
+    read a file written by na1001_to_columnar to a NASA AMES 1001 dict.
+    X is a 1D, V a 2D float array (one row per variable) with NaN for missing
+    values, as returned by nasa_ames_1001_read(engine="numpy",
+    vmiss_to_None=True). the dict can be passed to nasa_ames_1001_write,
+    which writes NaN as VMISS.
+    """
+    table, na_1001 = _read_table(file_path, fmt)
+    values = np.empty((table.num_columns, table.num_rows), dtype=np.float64)
+    for i, col in enumerate(table.columns):
+        values[i] = col.to_numpy()
+    na_1001['X'], na_1001['V'] = values[0], values[1:]
+    return na_1001
+
+
+def columnar_to_na1001_file(file_path, out_path, fmt=None, **kwargs):
+    """
+    regenerate the NASA AMES 1001 text file from a file written by
+    na1001_to_columnar, with the number format of each column as stored in
+    the metadata (str() for unknown formats). kwargs are passed to
+    nasa_ames_1001_write. returns the return value of nasa_ames_1001_write.
+    """
+    metadata = (pq.read_schema(file_path) if _get_fmt(file_path, fmt) == 'parquet'
+                else pf.read_table(file_path, memory_map=True).schema).metadata or {}
+    data_fmt = json.loads(metadata.get(DATA_FMT_KEY, b"null"))
+    if data_fmt is not None and all(f is None for f in data_fmt):
+        data_fmt = None
+    return na_w(out_path, columnar_to_na1001(file_path, fmt), data_fmt=data_fmt, **kwargs)
+
+
+def columnar_to_pddf(file_path, fmt=None, columns=None, apply_vscal=True):
+    """
+    read a file written by na1001_to_columnar to a pandas DataFrame, similar
+    to get_pddf_from_na1001. X is always loaded; columns selects variables.
+    returns:
+        tuple (DataFrame, na_1001 header dict)
+    """
+    table, header = _read_table(file_path, fmt)
+    all_names = table.column_names
+    if columns is not None:
+        table = table.select([table.column_names[0]] +
+                             [c for c in columns if c != table.column_names[0]])
+
+    df = table.to_pandas()
+    if apply_vscal:
+        for c in df.columns[1:]:
+            vscal = float(header['VSCAL'][all_names.index(c)-1])
+            if vscal != 1.:
+                df[c] *= vscal
+
+    return df, header
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import timeit
+    from na1001_to_pddf import get_pddf_from_na1001
+
+    # round trip of a file with mixed number formats
+    header = ["18 1001", "test", "test", "hand-written", "round trip", "1 1",
+              "2020 01 01 2020 01 01", "1", "TimeCRef;seconds since 2020-01-01;s",
+              "3", "1 1 1", "99999.999 99999 99999",
+              "a; variable a; unit", "b; variable b; unit", "c; variable c; unit",
+              "0", "1", "TimeCRef\ta\tb\tc"]
+    data = ["0\t1.50\t12\t1.5E+03", "1\t99999.999\t7\t99999",
+            "2\t2.25\t99999\t-2.0E-01", "3\t10.00\t-4\t3.3E+00"]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        f_txt = os.path.join(tmpdir, 'na1001_mixed.txt')
+        with open(f_txt, 'w') as fobj:
+            fobj.write("\n".join(header + data) + "\n")
+        for ext in ('.parquet', '.feather'):
+            f_bin = os.path.join(tmpdir, 'na1001' + ext)
+            na1001_to_columnar(f_txt, f_bin)
+            f_rt = os.path.join(tmpdir, 'na1001_rt.txt')
+            columnar_to_na1001_file(f_bin, f_rt, overwrite=True)
+            with open(f_txt) as fo1, open(f_rt) as fo2:
+                assert fo1.read() == fo2.read()
+
+    # benchmark: parsing the ASCII file vs. reading Parquet / Feather
+    n_rows, n_vars = 100_000, 20
+    rng = np.random.default_rng(42)
+    v = np.round(rng.normal(100, 10, (n_vars, n_rows)), 3)
+    v[:, ::50] = np.nan
+    names = ['TimeCRef'] + [f'v{i}' for i in range(n_vars)]
+    na = {'NLHEAD': 14+n_vars+1, 'FFI': 1001, 'ONAME': 'test', 'ORG': 'test',
+          'SNAME': 'synthetic', 'MNAME': 'benchmark', 'IVOL': 1, 'NVOL': 1,
+          'DATE': (2020, 1, 1), 'RDATE': (2020, 1, 1), 'DX': 1,
+          'XNAME': ['TimeCRef', 'seconds since 2020-01-01', 's'],
+          'NV': n_vars, 'VSCAL': ['1']*n_vars, 'VMISS': ['99999.999']*n_vars,
+          'VNAME': [f'v{i}; variable {i}; unit' for i in range(n_vars)],
+          'NSCOML': 0, 'SCOM': [], 'NNCOML': 1, 'NCOM': ['\t'.join(names)],
+          'X': np.arange(n_rows, dtype=np.float64), 'V': v}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        f_txt = os.path.join(tmpdir, 'na1001.txt')
+        na_w(f_txt, na)
+        tests = {'ASCII': lambda: get_pddf_from_na1001(f_txt, engine='numpy')}
+        for ext in ('.parquet', '.feather'):
+            f_bin = os.path.join(tmpdir, 'na1001' + ext)
+            na1001_to_columnar(f_txt, f_bin)
+            tests[ext] = lambda f=f_bin: columnar_to_pddf(f)
+            # round trip of a file written with str():
+            f_rt = os.path.join(tmpdir, 'na1001_rt.txt')
+            columnar_to_na1001_file(f_bin, f_rt, overwrite=True)
+            with open(f_txt) as fo1, open(f_rt) as fo2:
+                assert fo1.read() == fo2.read()
+
+        for name, func in tests.items():
+            dt = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{name}: {dt:.3f} s")
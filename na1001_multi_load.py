@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+r"""
+Created on Sat Oct 17 14:36:02 2026
+
+@author: F. Obersteiner, florian\obersteiner\\kit\edu
+
+load many NASA AMES 1001 files in parallel (process pool).
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from na1001_to_pddf import get_pddf_from_na1001
+from CARIBIC_files_general_functions import Find_NAfile, NAfilename_to_Flight_No
+
+
+def _load_na1001(file_path, kwargs):
+    """
+    worker: load one file with get_pddf_from_na1001. exceptions are returned,
+    not raised, so that one bad file does not abort the whole batch.
+    """
+    t0 = time.perf_counter()
+    try:
+        df = get_pddf_from_na1001(file_path, **kwargs)
+    except Exception as e:
+        return None, time.perf_counter()-t0, f"{type(e).__name__}: {e}"
+    return df, time.perf_counter()-t0, None
+
+
+def find_na1001_files(flights, prfx, *,
+                      flights_dir="//IMK-ASF-CARFS1/Caribic/extern/Caribic2data/Flights",
+                      binned_10s=False):
+    """
+    find the newest NASA AMES file with prefix prfx for each flight number in
+    flights (e.g. range(500, 550)), see Find_NAfile.
+    returns:
+        tuple of two lists, (found files, flight numbers without file).
+    """
+    files, not_found = [], []
+    for flight_no in flights:
+        try:
+            f = Find_NAfile(flight_no, prfx, flights_dir=flights_dir,
+                            binned_10s=binned_10s)
+        except (OSError, TypeError): # e.g. no folder for that flight
+            f = None
+        if f:
+            files.append(f)
+        else:
+            not_found.append(flight_no)
+    return files, not_found
+
+
+def load_na1001_files(files=None, *,
+                      flights=None, prfx=None,
+                      flights_dir="//IMK-ASF-CARFS1/Caribic/extern/Caribic2data/Flights",
+                      binned_10s=False,
+                      concat=False,
+                      max_workers=None,
+                      verbose=False,
+                      **kwargs):
+    """
+    load NASA AMES 1001 files to pandas DataFrames in parallel processes,
+    using get_pddf_from_na1001.
+
+    Parameters
+    ----------
+    files : list of string or pathlib Path, optional
+        files to load. The default is None.
+    flights : iterable of int, optional
+        flight numbers, e.g. range(500, 550). used together with prfx
+        if files is not specified. The default is None.
+    prfx : str, optional
+        file name prefix, e.g. 'MA', see Find_NAfile. The default is None.
+    flights_dir : str, optional
+        see Find_NAfile.
+    binned_10s : bool, optional
+        see Find_NAfile. The default is False.
+    concat : bool, optional
+        return one DataFrame with all data and an additional column
+        'FlightNo' instead of a dict. The default is False.
+    max_workers : int, optional
+        number of processes. The default is None (number of CPUs).
+    verbose : bool, optional
+        print a line for each file that was loaded. The default is False.
+    **kwargs :
+        passed to get_pddf_from_na1001.
+
+    Returns
+    -------
+    data : dict or pandas DataFrame
+        {file: DataFrame} for all successfully loaded files (input order), or
+        one DataFrame if concat=True.
+    report : pandas DataFrame
+        one line per file (or flight without file), with columns 'file',
+        'flight_no' (Int64, <NA> if unknown), 'time_s' (time to load, NaN if
+        the worker process died) and 'error' (None if ok).
+
+    """
+    verboseprint = print if verbose else lambda *a, **k: None
+
+    not_found = []
+    if files is None:
+        if flights is None or prfx is None:
+            raise ValueError("specify files, or flights and prfx.")
+        files, not_found = find_na1001_files(flights, prfx,
+                                             flights_dir=flights_dir,
+                                             binned_10s=binned_10s)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_load_na1001, f, kwargs): f for f in files}
+        for future in as_completed(futures):
+            f = futures[future]
+            try:
+                results[f] = future.result()
+            except Exception as e: # e.g. BrokenProcessPool (worker killed)
+                results[f] = None, float('nan'), f"{type(e).__name__}: {e}"
+            verboseprint(f"{f}: {results[f][1]:.2f} s" +
+                         (f", failed ({results[f][2]})" if results[f][2] else ""))
+
+    report, flight_no = [], {}
+    for f in files:
+        try:
+            flight_no[f] = NAfilename_to_Flight_No(f)
+        except ValueError: # not a CARIBIC file name
+            flight_no[f] = None
+        report.append({'file': f, 'flight_no': flight_no[f],
+                       'time_s': results[f][1], 'error': results[f][2]})
+    report += [{'file': None, 'flight_no': n, 'time_s': 0.,
+                'error': 'no file found'} for n in not_found]
+    report = pd.DataFrame(report, columns=['file', 'flight_no', 'time_s', 'error'])
+    report['flight_no'] = report['flight_no'].astype('Int64') # None -> <NA>
+
+    data = {f: results[f][0] for f in files if results[f][2] is None}
+
+    if concat:
+        data = (pd.concat([df.assign(FlightNo=pd.array([flight_no[f]]*len(df), dtype='Int64'))
+                           for f, df in data.items()], ignore_index=True)
+                if data else pd.DataFrame())
+
+    return data, report
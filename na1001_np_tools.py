@@ -8,6 +8,8 @@ Created on Wed May 29 08:35:12 2019
 import numpy as np
 import pandas as pd
 
+from nasa_ames_1001_read import NA1001LazyReader
+
 def naDict2npndarr(naDict,
                    selVnames=None,
                    return_pddf=False,
@@ -21,7 +23,8 @@ def naDict2npndarr(naDict,
     Parameters
     ----------
     naDict : NASA AMES 1001 data in Python dict.
-        ...as returned by nasa_ames_1001_read.
+        ...as returned by nasa_ames_1001_read. Can also be a NA1001LazyReader;
+        then only X and the selected variables are decoded from the file.
     selVnames : list of string, optional
         VNAMEs to be converted. The default is None.
     return_pddf : bool, optional
@@ -44,7 +47,10 @@ def naDict2npndarr(naDict,
         dictionary holding numpy arrays for variables from the NASA AMES file.
 
     """
-    npDict = {naDict['XNAME'][0]: np.array(naDict['X'], dtype=xdtype)}
+    lazy = isinstance(naDict, NA1001LazyReader)
+
+    x = naDict.read_x() if lazy else naDict['X']
+    npDict = {naDict['XNAME'][0]: np.array(x, dtype=xdtype)}
 
     # convenience: link npDict['x'] to npDict[naDict['XNAME'][0]]
     if create_x:
@@ -54,12 +60,19 @@ def naDict2npndarr(naDict,
         selVnames = [n.split(splitVname)[0] for n in naDict['VNAME']]
 
     # for each parameter, find its index in naDict['V']
-    for parm in selVnames:
-        if splitVname:
-            ix = [l.split(splitVname)[splitIdx] for l in naDict['VNAME']].index(parm)
-        else:
-            ix = naDict['VNAME'].index(parm)
-        npDict[parm] = np.array(naDict['V'][ix], dtype=vdtype)
+    if splitVname:
+        vnames = [l.split(splitVname)[splitIdx] for l in naDict['VNAME']]
+    else:
+        vnames = naDict['VNAME']
+    parm_ix = [vnames.index(parm) for parm in selVnames]
+
+    if lazy: # decode all selected variables in one pass over the file
+        v = dict(zip(parm_ix, naDict.read_columns([ix+1 for ix in parm_ix])))
+    else:
+        v = naDict['V']
+
+    for parm, ix in zip(selVnames, parm_ix):
+        npDict[parm] = np.array(v[ix], dtype=vdtype)
 
         # check vmiss: make sure that vmiss=0 also works by checking for type
         # boolean. Might be a bit confusing since vmiss=True would also result
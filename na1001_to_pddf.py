@@ -9,13 +9,18 @@ import pandas as pd
 import numpy as np
 
 from nasa_ames_1001_read import nasa_ames_1001_read as na_r
+from nasa_ames_1001_read import NA1001LazyReader
+from na1001_cache import na1001_read_cached
 from timeconversions import mdns_2_datetimeobj as mdns2dt
 
 def get_pddf_from_na1001(file_path,
                          sep=" ", sep_data="\t", sep_com=";",
                          vscale_vmiss_vertical=False,
                          dtype=np.float64,
-                         add_datetime=False):
+                         add_datetime=False,
+                         usecols=None,
+                         use_cache=False, cache_dir=None,
+                         engine="python"):
     """
     WHAT?
         wrapper for nasa_ames_1001_read() that just returns a Pandas DataFrame
@@ -38,6 +43,22 @@ def get_pddf_from_na1001(file_path,
         data type to use for conversion to DataFrame. The default is np.float64.
     add_datetime: boolean, optional
         derive a datetime object for each row. The default is False.
+    usecols: list of string, optional
+        names of the parameters (as found in the last line of NCOM) to load.
+        X is always loaded. If specified, the file is memory-mapped and only
+        the selected columns are decoded; with use_cache, the columns are
+        selected from the cached data. The default is None (all columns).
+    use_cache: boolean, optional
+        use na1001_read_cached to read the file; repeated reads of an unchanged
+        file then skip the text parsing. The default is False.
+    cache_dir: string or pathlib Path, optional
+        see na1001_read_cached. The default is None.
+    engine: string, optional
+        "python": read data to lists of strings with nasa_ames_1001_read,
+        then convert. "numpy": parse the data directly into one preallocated
+        array of type dtype (VMISS to NaN, VSCAL applied during the parsing)
+        that the DataFrame uses without copy; peak memory is close to the
+        size of the DataFrame. The default is "python".
 
     Returns
     -------
@@ -45,25 +66,38 @@ def get_pddf_from_na1001(file_path,
         dataframe with a column for X and one for each parameter in V.
 
     """
-    na_dct = na_r(file_path,
-                  sep=sep, sep_data=sep_data, sep_com=sep_com,
-                  vscale_vmiss_vertical=vscale_vmiss_vertical,
-                  auto_nncoml=True, strip_lines=True,
-                  remove_doubleseps=True, vmiss_to_None=True)
+    if not use_cache and (usecols is not None or engine == "numpy"):
+        return _get_pddf_direct(file_path, usecols,
+                                sep=sep, sep_data=sep_data, sep_com=sep_com,
+                                vscale_vmiss_vertical=vscale_vmiss_vertical,
+                                dtype=dtype, add_datetime=add_datetime)
 
-    keys = na_dct['NCOM'][-1].split(sep_data)
+    read_kwargs = dict(sep=sep, sep_data=sep_data, sep_com=sep_com,
+                       vscale_vmiss_vertical=vscale_vmiss_vertical,
+                       auto_nncoml=True, strip_lines=True,
+                       remove_doubleseps=True, vmiss_to_None=True)
+    if use_cache:
+        na_dct = na1001_read_cached(file_path, cache_dir=cache_dir, **read_kwargs)
+    else:
+        na_dct = na_r(file_path, **read_kwargs)
+
+    keys = all_keys = na_dct['NCOM'][-1].split(sep_data)
+    v_ix = range(len(na_dct['V']))
+    if usecols is not None:
+        keys = [all_keys[0]] + [k for k in usecols if k != all_keys[0]]
+        v_ix = [all_keys.index(k)-1 for k in keys[1:]]
 
     # converting to np.array before conversion to pd.df is more efficient:
     values = [np.array(na_dct['X'], dtype=dtype)]
 
     # check scaling factors:
     if all(s == '1' for s in na_dct['VSCAL']):
-        for v_n in na_dct['V']:
-            values.append(np.array(v_n, dtype=dtype))
+        for i in v_ix:
+            values.append(np.array(na_dct['V'][i], dtype=dtype))
     else:
         vscal = [float(s) for s in na_dct['VSCAL']]
-        for i, v_n in enumerate(na_dct['V']):
-            values.append(np.array(v_n, dtype=dtype)*vscal[i])
+        for i in v_ix:
+            values.append(np.array(na_dct['V'][i], dtype=dtype)*vscal[i])
 
     if add_datetime:
         keys = ['DateTime'] + keys
@@ -76,6 +110,41 @@ def get_pddf_from_na1001(file_path,
     # df.columns = keys
     # return df
 
+def _get_pddf_direct(file_path, usecols=None,
+                     sep=" ", sep_data="\t", sep_com=";",
+                     vscale_vmiss_vertical=False,
+                     dtype=np.float64,
+                     add_datetime=False):
+    """
+    get_pddf_from_na1001 without intermediate lists of strings: the data is
+    parsed block-wise from the memory-mapped file into one preallocated 2D
+    array (VMISS to NaN and VSCAL applied during the parsing) which is then
+    wrapped by the DataFrame without copying. if usecols is specified, only
+    X and the selected columns are parsed.
+    """
+    with NA1001LazyReader(file_path,
+                          sep=sep, sep_data=sep_data, sep_com=sep_com,
+                          vscale_vmiss_vertical=vscale_vmiss_vertical,
+                          auto_nncoml=True, strip_lines=True,
+                          remove_doubleseps=True) as reader:
+        keys = all_keys = reader['NCOM'][-1].split(sep_data)
+        col_ix = None
+        if usecols is not None:
+            keys = [all_keys[0]] + [k for k in usecols if k != all_keys[0]]
+            col_ix = [all_keys.index(k) for k in keys]
+        values = reader.read_block(col_ix, dtype=dtype,
+                                   vmiss_to_nan=True, apply_vscal=True)
+        date = reader['DATE']
+
+    # values.T is F-contiguous, so pandas can use it as block without copy:
+    df = pd.DataFrame(values.T, columns=keys, copy=False)
+
+    if add_datetime:
+        df.insert(0, 'DateTime', mdns2dt(values[0], tuple(date)))
+
+    return df
+
+
 if __name__ == '__main__':
     file = 'D:/PROGRAMMING/Python/Python_Testing/TESTDATA/NA_read/valid.txt'
     df = get_pddf_from_na1001(file, add_datetime=True)
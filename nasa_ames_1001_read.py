@@ -8,18 +8,510 @@ more info on NASA AMES file format:
     https://espoarchive.nasa.gov/content/Ames_Format_Specification_v20
 """
 import os
+import mmap
+import warnings
+from itertools import islice
 from pathlib import Path as makePath
 from datetime import date
 
+import numpy as np
 
-def check_lt128(file):
+
+def _first_non_ascii(content):
+    """
+    find the first byte >= 128 in bytes-like content.
+    returns tuple (offset, line number (1-based)) or None if all bytes < 128.
+    """
+    if content.isascii():
+        return None
+    offset = int(np.argmax(np.frombuffer(content, dtype=np.uint8) >= 128))
+    return offset, content.count(b"\n", 0, offset) + 1
+
+
+def find_non_ascii(file, chunksize=2**24):
+    """
+    find the first byte >= 128 in a file. the file is read in blocks of
+    chunksize bytes.
+    returns tuple (offset, line number (1-based)) or None if all bytes < 128.
+    """
+    offset, line = 0, 0
+    with open(file, 'rb') as f:
+        while True:
+            chunk = f.read(chunksize)
+            if not chunk:
+                return None
+            result = _first_non_ascii(chunk)
+            if result:
+                return offset+result[0], line+result[1]
+            offset += len(chunk)
+            line += chunk.count(b"\n")
+
+
+def check_lt128(file, chunksize=2**24):
     """
     Check if all bytes of a file are less than decimal 128.
     Returns True for an ASCII encoded text file.
     """
-    with open(file, 'rb') as f:
-        content = f.read()
-    return all(b<128 for b in content)
+    return find_non_ascii(file, chunksize=chunksize) is None
+
+
+def _fields_per_line(text, stop=None, blocksize=2**24):
+    """
+    number of whitespace-separated fields in each line of text[:stop] (str,
+    ASCII); vectorised, text is processed in blocks of about blocksize
+    characters.
+    """
+    stop = len(text) if stop is None else stop
+    counts, pos = [], 0
+    while pos < stop:
+        end = text.find("\n", pos+blocksize, stop)
+        end = stop if end == -1 else end+1
+        b = np.frombuffer(text[pos:end].encode("ASCII"), dtype=np.uint8)
+        ws = np.empty(b.size+1, dtype=np.bool_) # whitespace: <= 32 (" ", "\t", ...)
+        ws[0] = True
+        np.less_equal(b, 32, out=ws[1:])
+        starts = np.flatnonzero(ws[:-1] > ws[1:]) # first character of each field
+        n_before = np.searchsorted(starts, np.flatnonzero(b == 10)) # fields before each "\n"
+        n = np.diff(np.concatenate(([0], n_before, [starts.size])))
+        counts.append(n[:-1] if b[-1] == 10 else n)
+        pos = end
+    return np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+
+
+def _parse_data_np(data_block, n_vars, sep_data="\t", vmiss=None,
+                   file_name="", nlhead=0):
+    """
+    parse the data block of a NASA AMES 1001 file (one string) in one go to a
+    2D float array with one row per variable: [X, V1, V2, ..., Vn].
+    if vmiss (list of string) is supplied, missing values are set to NaN.
+    """
+    n_cols = n_vars + 1
+    if not sep_data.isspace():
+        data_block = data_block.replace(sep_data, " ")
+
+    # number of (non-empty) lines; ignore trailing whitespace w/o copying
+    end = len(data_block)
+    while end and data_block[end-1].isspace():
+        end -= 1
+    n_lines = data_block.count("\n", 0, end) + 1 if end else 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(data_block, dtype=np.float64, sep=" ")
+        except (ValueError, DeprecationWarning): # non-numeric element
+            values = np.empty(0)
+
+    # total number of values and number of fields in each line:
+    if (values.size != n_lines*n_cols or
+            np.any(_fields_per_line(data_block, end) != n_cols)):
+        # find the line that caused the problem
+        for ix, line in enumerate(data_block[:end].split("\n")):
+            l = line.split()
+            assert len(l) == n_cols, f'{file_name}: invalid number of parameters in line {ix+nlhead}'
+            try:
+                list(map(float, l))
+            except ValueError as e:
+                raise ValueError(f'{file_name}: invalid value in line {ix+nlhead}') from e
+
+    # transpose so that each variable is a contiguous 1D array
+    values = np.ascontiguousarray(values.reshape(n_lines, n_cols).T)
+
+    if vmiss is not None:
+        for j, vm in enumerate(vmiss):
+            v_j = values[j+1]
+            v_j[v_j == float(vm)] = np.nan
+
+    return values
+
+
+def _read_header_lines(file_obj):
+    """
+    read the NLHEAD header lines from an open file object (text or binary
+    mode). leaves the file position at the beginning of the data block.
+    """
+    lines = [file_obj.readline()]
+    nlhead = int(lines[0].split()[0])
+    lines += [file_obj.readline() for _ in range(nlhead-1)]
+    if isinstance(lines[0], bytes):
+        lines = [l.decode("ASCII") for l in lines]
+    return lines
+
+
+def _clean_lines(lines, sep=" ", strip_lines=True, remove_doubleseps=False):
+    """
+    strip lines and / or remove repeated separators; list is modified in-place.
+    """
+    if strip_lines:
+        for i, line in enumerate(lines):
+            lines[i] = line.strip()
+
+    if remove_doubleseps:
+        for i, line in enumerate(lines):
+            while sep+sep in line:
+                line = line.replace(sep+sep, sep)
+            lines[i] = line
+
+
+def _parse_header(header, sep_com=";", auto_nncoml=True,
+                  vscale_vmiss_vertical=False):
+    """
+    parse the header of a NASA AMES 1001 file, supplied as list of strings
+    (one element per line). see nasa_ames_1001_read for keywords.
+    returns na_1001 dictionary; X and V are None.
+    """
+    na_1001 = {'NLHEAD': None,
+               'FFI': None,
+               'ONAME': None,
+               'ORG': None,
+               'SNAME': None,
+               'MNAME': None,
+               'IVOL': None,
+               'NVOL': None,
+               'DATE': None,
+               'RDATE': None,
+               'DX': None,
+               'XNAME': None,
+               'NV': None,
+               'VSCAL': None,
+               'VMISS': None,
+               'VNAME': None,
+               'NSCOML': None,
+               'SCOM': None,
+               'NNCOML': None,
+               'NCOM': None,
+               'X': None,
+               'V': None}
+
+    tmp = list(map(int, header[0].split()))
+    assert len(tmp) == 2, f"invalid format in {header[0]} (line 1)"
+    assert tmp[1] == 1001, f"invalid FFI in {header[0]} (line 1)"
+
+    nlhead = tmp[0]
+    na_1001['NLHEAD'] = nlhead
+    na_1001['FFI'] = tmp[1]
+
+    na_1001['ONAME'] = header[1]
+    na_1001['ORG'] = header[2]
+    na_1001['SNAME'] = header[3]
+    na_1001['MNAME'] = header[4]
+
+    tmp = list(map(int, header[5].split()))
+    assert len(tmp) ==2, f"invalid format {header[5]} (line 6)"
+    na_1001['IVOL'], na_1001['NVOL'] = tmp[0], tmp[1]
+
+    tmp = list(map(int, header[6].split()))
+    assert len(tmp) == 6, f"invalid format {header[6]} (line 7)"
+    # check for valid date in line 7 (yyyy mm dd)
+    date(*tmp[:3]), date(*tmp[3:6])
+    na_1001['DATE'], na_1001['RDATE'] = tmp[:3], tmp[3:6]
+
+    na_1001['DX'] = float(header[7]) # dx=0 means non-uniform independent variable.
+    na_1001['XNAME'] = header[8].rsplit(sep=sep_com)
+    # CARIBIC: [0] is type, [1] is description, [2] is unit.
+
+    n_vars = int(header[9])
+    na_1001['NV'] = n_vars
+
+    if vscale_vmiss_vertical:
+        offset = n_vars*2
+        na_1001['VSCAL'] = header[10:10+n_vars]
+        na_1001['VMISS'] = header[10+n_vars:10+n_vars*2]
+    else:
+        offset = 2
+        na_1001['VSCAL'] = header[10].split()
+        na_1001['VMISS'] = header[11].split()
+    # test case:
+    msg = "vscal, vmiss and vname must have equal number of elements"
+    assert n_vars == len(na_1001['VSCAL']) == len(na_1001['VMISS']), msg
+
+    na_1001['VNAME'] = header[10+offset:10+n_vars+offset]
+
+    nscoml = int(header[10+n_vars+offset])
+    na_1001['NSCOML'] = nscoml
+    if nscoml > 0: # read special comment if nscoml>0
+        na_1001['SCOM'] = header[n_vars+11+offset:n_vars+nscoml+11+offset]
+    else:
+        na_1001['SCOM'] = ""
+    # test case:
+    msg = "nscoml not equal n elements in list na_1001['SCOM']"
+    assert nscoml == len(na_1001['SCOM']), msg
+
+    # read normal comment if nncoml>0
+    if auto_nncoml is True:
+        nncoml = nlhead-(n_vars+nscoml+12+offset)
+    else:
+        nncoml = int(header[n_vars+nscoml+11+offset])
+    na_1001['NNCOML'] = nncoml
+
+    if nncoml > 0:
+        na_1001['NCOM'] = header[n_vars+nscoml+12+offset:n_vars+nscoml+nncoml+12+offset]
+    else:
+        na_1001['NCOM'] = ""
+    # test case:
+    msg = "nncoml not equal n elements in list na_1001['NCOM']"
+    assert nncoml == len(na_1001['NCOM']), msg
+    # test case
+    msg = "nlhead must be equal to nncoml + nscoml + n_vars + 14"
+    assert nncoml+nscoml+n_vars+14 == nlhead, msg
+
+    return na_1001
+
+
+def nasa_ames_1001_read_header(file_path, sep=" ", sep_com=";",
+                               auto_nncoml=True,
+                               strip_lines=True,
+                               remove_doubleseps=False,
+                               vscale_vmiss_vertical=False):
+    """
+    read only the header of a NASA AMES 1001 formatted text file.
+    see nasa_ames_1001_read for keywords.
+    returns:
+        na_1001: dictionary as returned by nasa_ames_1001_read; X and V are None.
+    """
+    with open(file_path, "r", encoding="ASCII") as file_obj:
+        header = _read_header_lines(file_obj)
+
+    _clean_lines(header, sep=sep, strip_lines=strip_lines,
+                 remove_doubleseps=remove_doubleseps)
+
+    return _parse_header(header, sep_com=sep_com, auto_nncoml=auto_nncoml,
+                         vscale_vmiss_vertical=vscale_vmiss_vertical)
+
+
+class NA1001LazyReader():
+    """
+    lazy access to the data of a NASA AMES 1001 file. the header is parsed
+    on initialisation, the file is memory-mapped and an index of the line
+    offsets in the data block is built once. data is only decoded for the
+    requested variables (and rows), in blocks of 'chunksize' lines, so that
+    memory usage scales with the selection, not with the file.
+    header elements are available as na_1001 dict keys, e.g. reader['VNAME'].
+
+    usage:
+        with NA1001LazyReader(file) as reader:
+            x = reader.read_x()
+            v = reader.read_v(['Ozone', 'CO'], rows=(0, 1000))
+    """
+    def __init__(self, file_path, sep=" ", sep_com=";", sep_data="\t",
+                 auto_nncoml=True,
+                 strip_lines=True,
+                 remove_doubleseps=False,
+                 vscale_vmiss_vertical=False,
+                 splitVname=";",
+                 chunksize=10_000):
+        self.file_path = makePath(file_path)
+        if not os.path.isfile(self.file_path):
+            raise FileExistsError(str(self.file_path) + "\n    does not exist.")
+
+        self.sep_data, self.splitVname = sep_data, splitVname
+        self.chunksize = chunksize
+
+        self._file_obj = open(self.file_path, "rb")
+        header = _read_header_lines(self._file_obj)
+        self._data_start = self._file_obj.tell()
+
+        _clean_lines(header, sep=sep, strip_lines=strip_lines,
+                     remove_doubleseps=remove_doubleseps)
+        self.header = _parse_header(header, sep_com=sep_com,
+                                    auto_nncoml=auto_nncoml,
+                                    vscale_vmiss_vertical=vscale_vmiss_vertical)
+
+        self._mm = mmap.mmap(self._file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+        self._line_start = self._index_lines()
+        assert self._line_start.size, "no data found."
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getitem__(self, key):
+        return self.header[key]
+
+    def __len__(self):
+        return self.n_rows
+
+    def close(self):
+        """ release the memory map and close the file. """
+        self._mm.close()
+        self._file_obj.close()
+
+    def _index_lines(self, blocksize=2**24):
+        """
+        find the start offset of each line in the data block. the file is
+        scanned in blocks so that memory usage stays at ~blocksize.
+        """
+        self._data_end = len(self._mm) # ignore trailing whitespace
+        while (self._data_end > self._data_start and
+               self._mm[self._data_end-1:self._data_end].isspace()):
+            self._data_end -= 1
+
+        starts = [np.array([self._data_start], dtype=np.int64)]
+        for pos in range(self._data_start, self._data_end, blocksize):
+            n = min(blocksize, self._data_end-pos)
+            block = np.frombuffer(self._mm, dtype=np.uint8, count=n, offset=pos)
+            starts.append(np.flatnonzero(block == 10).astype(np.int64) + pos + 1)
+            del block # release the buffer export, otherwise mmap can't close
+
+        starts = np.concatenate(starts)
+        return starts[starts < self._data_end]
+
+    @property
+    def n_rows(self):
+        """ number of lines in the data block. """
+        return self._line_start.size
+
+    @property
+    def vnames(self):
+        """ VNAMEs, split at splitVname (first element), if specified. """
+        if self.splitVname:
+            return [n.split(self.splitVname)[0].strip() for n in self.header['VNAME']]
+        return self.header['VNAME']
+
+    def _row_range(self, rows):
+        if rows is None:
+            return 0, self.n_rows
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(self.n_rows)
+            if step != 1:
+                raise ValueError("only contiguous row ranges are supported.")
+            return start, max(start, stop)
+        start, stop = rows
+        return max(0, start), min(self.n_rows, stop)
+
+    def read_block(self, col_ix=None, rows=None, dtype=np.float64,
+                   vmiss_to_nan=False, apply_vscal=False):
+        """
+        decode the columns specified by col_ix (0 = X, 1 = first variable of
+        V etc.; default all) for the range of rows (tuple (start, stop) or
+        slice; default all) into a preallocated 2D array of type dtype, with
+        one row per column. VMISS to NaN conversion and scaling by VSCAL are
+        done block-wise during the parsing, so no full-size intermediate
+        copies are made.
+        """
+        if col_ix is None:
+            col_ix = list(range(self.header['NV']+1))
+        row0, row1 = self._row_range(rows)
+        n_vars = self.header['NV']
+        out = np.empty((len(col_ix), row1-row0), dtype=dtype)
+
+        vmiss = [float(self.header['VMISS'][ix-1]) if (ix and vmiss_to_nan) else None
+                 for ix in col_ix]
+        vscal = [float(self.header['VSCAL'][ix-1]) if (ix and apply_vscal) else 1.
+                 for ix in col_ix]
+
+        for r in range(row0, row1, self.chunksize):
+            r_end = min(r+self.chunksize, row1)
+            b0 = self._line_start[r]
+            b1 = self._line_start[r_end] if r_end < self.n_rows else self._data_end
+            values = _parse_data_np(self._mm[b0:b1].decode("ASCII"), n_vars,
+                                    sep_data=self.sep_data,
+                                    file_name=self.file_path.name,
+                                    nlhead=self.header['NLHEAD']+r)
+            for j, ix in enumerate(col_ix):
+                v = values[ix]
+                if vmiss[j] is not None:
+                    v[v == vmiss[j]] = np.nan
+                if vscal[j] != 1.:
+                    v *= vscal[j]
+                out[j, r-row0:r_end-row0] = v
+
+        return out
+
+    def read_columns(self, col_ix, rows=None, vmiss_to_nan=False):
+        """
+        like read_block, but returns a list of 1D float arrays.
+        """
+        return list(self.read_block(col_ix, rows=rows, vmiss_to_nan=vmiss_to_nan))
+
+    def read_x(self, rows=None):
+        """ decode the independent variable X. """
+        return self.read_columns([0], rows=rows)[0]
+
+    def read_v(self, vnames, rows=None, vmiss_to_nan=False):
+        """
+        decode dependent variable(s) V, specified by name (see vnames) or
+        index in V. returns a dict {name: 1D float array}.
+        """
+        if isinstance(vnames, (str, int)):
+            vnames = [vnames]
+        col_ix = [n+1 if isinstance(n, int) else self.vnames.index(n)+1
+                  for n in vnames]
+        return dict(zip(vnames, self.read_columns(col_ix, rows=rows,
+                                                  vmiss_to_nan=vmiss_to_nan)))
+
+
+class NA1001ChunkIterator:
+    """
+    iterable over the data block of a NASA AMES 1001 file in blocks of
+    'chunksize' lines, returned by iter_na1001_chunks. the header is parsed
+    on creation and available as attribute 'header' (and by key, e.g.
+    chunks['VMISS']) before and during the iteration. each iteration reads
+    the data block again, line by line.
+    """
+    def __init__(self, file_path, chunksize=10_000,
+                 sep=" ", sep_com=";", sep_data="\t",
+                 vscale_vmiss_vertical=False,
+                 vmiss_to_nan=False):
+        self.file_path, self.chunksize = file_path, chunksize
+        self.sep_data, self.vmiss_to_nan = sep_data, vmiss_to_nan
+        with open(file_path, "r", encoding="ASCII") as file_obj:
+            header = _read_header_lines(file_obj)
+            self._data_start = file_obj.tell()
+        _clean_lines(header, sep=sep)
+        self.header = _parse_header(header, sep_com=sep_com,
+                                    vscale_vmiss_vertical=vscale_vmiss_vertical)
+
+    def __getitem__(self, key):
+        return self.header[key]
+
+    def __iter__(self):
+        na_1001 = self.header
+        vmiss = na_1001['VMISS'] if self.vmiss_to_nan else None
+        line_no = na_1001['NLHEAD']
+        with open(self.file_path, "r", encoding="ASCII") as file_obj:
+            file_obj.seek(self._data_start)
+            while True:
+                lines = list(islice(file_obj, self.chunksize))
+                if not lines:
+                    break
+                values = _parse_data_np("".join(lines), na_1001['NV'],
+                                        sep_data=self.sep_data, vmiss=vmiss,
+                                        file_name=os.path.basename(self.file_path),
+                                        nlhead=line_no)
+                line_no += len(lines)
+                if values.shape[1]:
+                    yield values[0], values[1:]
+
+
+def iter_na1001_chunks(file_path, chunksize=10_000,
+                       sep=" ", sep_com=";", sep_data="\t",
+                       vscale_vmiss_vertical=False,
+                       vmiss_to_nan=False):
+    """
+    iterate over the data block of a NASA AMES 1001 file in blocks of
+    'chunksize' lines. the file is read line by line, so memory usage is
+    determined by chunksize, not by the file size.
+
+    returns:
+        NA1001ChunkIterator; the parsed header is available as attribute
+        'header' (dict as returned by nasa_ames_1001_read_header).
+    yields:
+        tuple (x, v); x: 1D float array, v: 2D float array with one row per
+        variable. the last block may be shorter than chunksize.
+
+    usage, e.g. binning with constant memory:
+        chunks = iter_na1001_chunks(file, chunksize=3600)
+        vscal = float(chunks.header['VSCAL'][0])
+        for x, v in chunks:
+            v_binned = bin_by_npreduceat(v[0]*vscal, 360)
+    """
+    return NA1001ChunkIterator(file_path, chunksize=chunksize,
+                               sep=sep, sep_com=sep_com, sep_data=sep_data,
+                               vscale_vmiss_vertical=vscale_vmiss_vertical,
+                               vmiss_to_nan=vmiss_to_nan)
 
 
 def nasa_ames_1001_read(file_path, sep=" ", sep_com=";", sep_data="\t",
@@ -28,7 +520,8 @@ def nasa_ames_1001_read(file_path, sep=" ", sep_com=";", sep_data="\t",
                         remove_doubleseps=False,
                         vscale_vmiss_vertical=False,
                         vmiss_to_None=False,
-                        ensure_ascii=True):
+                        ensure_ascii=True,
+                        engine="python"):
     """
     read NASA AMES 1001 formatted text file. expected encoding is ASCII.
     args:
@@ -48,11 +541,19 @@ def nasa_ames_1001_read(file_path, sep=" ", sep_com=";", sep_data="\t",
                                      line each (e.g. for DLR Bahamas files)
         vmiss_to_None: set True if missing values should be replaced with None.
         ensure_ascii: check if all bytes in the specified file are < 128.
+        engine="python": "python" returns X and V as lists of strings.
+                         "numpy" parses the data block in one go and returns
+                         X as 1D and V as 2D float array (one row per
+                         variable). vmiss_to_None then gives NaN instead of
+                         None. much faster for large files.
 
     returns:
         na_1001: dictionary with keys according to NASA AMES 1001 file
                  specification
     """
+    if engine not in ("python", "numpy"):
+        raise ValueError(f"invalid engine '{engine}', use 'python' or 'numpy'.")
+
     try:
         file_path.is_file()
     except AttributeError: # file path is not provided as path object; convert
@@ -61,125 +562,48 @@ def nasa_ames_1001_read(file_path, sep=" ", sep_com=";", sep_data="\t",
     if not os.path.isfile(file_path): # check if file exists
         raise FileExistsError(str(file_path) + "\n    does not exist.")
     else:
-        if ensure_ascii:
-            if not check_lt128(file_path):
-                raise TypeError(f"non-ASCII character found in {str(file_path)}")
+        # read the file only once; the ASCII codec checks each block while
+        # reading, the position of a non-ASCII byte is only searched on error.
+        try:
+            with open(file_path, "r", encoding="ASCII") as file_obj:
+                if engine == "numpy": # read header to string list, data to string
+                    data = _read_header_lines(file_obj)
+                    data_block = file_obj.read()
+                else:
+                    data = file_obj.readlines() # read file content to string list
+        except UnicodeDecodeError:
+            if not ensure_ascii:
+                raise
+            result = find_non_ascii(file_path)
+            raise TypeError(f"non-ASCII character found in {str(file_path)} "
+                            f"(byte {result[0]}, line {result[1]})") from None
 
-        with open(file_path, "r", encoding="ASCII") as file_obj:
-            data = file_obj.readlines() # read file content to string list
-
-        if strip_lines:
-            for i, line in enumerate(data):
-                data[i] = line.strip()
-
-        if remove_doubleseps:
-            for i, line in enumerate(data):
-                while sep+sep in line:
-                    line = line.replace(sep+sep, sep)
-                data[i] = line
-
-        na_1001 = {'NLHEAD': None,
-                   'FFI': None,
-                   'ONAME': None,
-                   'ORG': None,
-                   'SNAME': None,
-                   'MNAME': None,
-                   'IVOL': None,
-                   'NVOL': None,
-                   'DATE': None,
-                   'RDATE': None,
-                   'DX': None,
-                   'XNAME': None,
-                   'NV': None,
-                   'VSCAL': None,
-                   'VMISS': None,
-                   'VNAME': None,
-                   'NSCOML': None,
-                   'SCOM': None,
-                   'NNCOML': None,
-                   'NCOM': None,
-                   'X': None,
-                   'V': None}
-
-        tmp = list(map(int, data[0].split()))
-        assert len(tmp) == 2, f"invalid format in {data[0]} (line 1)"
-        assert tmp[1] == 1001, f"invalid FFI in {data[0]} (line 1)"
-
-        nlhead = tmp[0]
-        na_1001['NLHEAD'] = nlhead
-        na_1001['FFI'] = tmp[1]
+        _clean_lines(data, sep=sep, strip_lines=strip_lines,
+                     remove_doubleseps=remove_doubleseps)
 
+        nlhead = int(data[0].split()[0])
         header = data[0:nlhead]
         data = data[nlhead:]
 
         # test case: no data ->
-        assert data, "no data found."
-
-        na_1001['ONAME'] = header[1]
-        na_1001['ORG'] = header[2]
-        na_1001['SNAME'] = header[3]
-        na_1001['MNAME'] = header[4]
-
-        tmp = list(map(int, header[5].split()))
-        assert len(tmp) ==2, f"invalid format {header[5]} (line 6)"
-        na_1001['IVOL'], na_1001['NVOL'] = tmp[0], tmp[1]
-
-        tmp = list(map(int, header[6].split()))
-        assert len(tmp) == 6, f"invalid format {header[6]} (line 7)"
-        # check for valid date in line 7 (yyyy mm dd)
-        date(*tmp[:3]), date(*tmp[3:6])
-        na_1001['DATE'], na_1001['RDATE'] = tmp[:3], tmp[3:6]
-
-        na_1001['DX'] = float(header[7]) # dx=0 means non-uniform independent variable.
-        na_1001['XNAME'] = header[8].rsplit(sep=sep_com)
-        # CARIBIC: [0] is type, [1] is description, [2] is unit.
-
-        n_vars = int(header[9])
-        na_1001['NV'] = n_vars
-
-        if vscale_vmiss_vertical:
-            offset = n_vars*2
-            na_1001['VSCAL'] = header[10:10+n_vars]
-            na_1001['VMISS'] = header[10+n_vars:10+n_vars*2]
-        else:
-            offset = 2
-            na_1001['VSCAL'] = header[10].split()
-            na_1001['VMISS'] = header[11].split()
-        # test case:
-        msg = "vscal, vmiss and vname must have equal number of elements"
-        assert n_vars == len(na_1001['VSCAL']) == len(na_1001['VMISS']), msg
-
-        na_1001['VNAME'] = header[10+offset:10+n_vars+offset]
-
-        nscoml = int(header[10+n_vars+offset])
-        na_1001['NSCOML'] = nscoml
-        if nscoml > 0: # read special comment if nscoml>0
-            na_1001['SCOM'] = header[n_vars+11+offset:n_vars+nscoml+11+offset]
-        else:
-            na_1001['SCOM'] = ""
-        # test case:
-        msg = "nscoml not equal n elements in list na_1001['SCOM']"
-        assert nscoml == len(na_1001['SCOM']), msg
-
-        # read normal comment if nncoml>0
-        if auto_nncoml is True:
-            nncoml = nlhead-(n_vars+nscoml+12+offset)
+        if engine == "numpy":
+            assert data_block and not data_block.isspace(), "no data found."
         else:
-            nncoml = int(header[n_vars+nscoml+11+offset])
-        na_1001['NNCOML'] = nncoml
+            assert data, "no data found."
 
-        if nncoml > 0:
-            na_1001['NCOM'] = header[n_vars+nscoml+12+offset:n_vars+nscoml+nncoml+12+offset]
-        else:
-            na_1001['NCOM'] = ""
-        # test case:
-        msg = "nncoml not equal n elements in list na_1001['NCOM']"
-        assert nncoml == len(na_1001['NCOM']), msg
-        # test case
-        msg = "nlhead must be equal to nncoml + nscoml + n_vars + 14"
-        assert nncoml+nscoml+n_vars+14 == nlhead, msg
+        na_1001 = _parse_header(header, sep_com=sep_com,
+                                auto_nncoml=auto_nncoml,
+                                vscale_vmiss_vertical=vscale_vmiss_vertical)
+        n_vars = na_1001['NV']
 
         # done with header, continue with variables.
+        if engine == "numpy":
+            values = _parse_data_np(data_block, n_vars, sep_data=sep_data,
+                                    vmiss=na_1001['VMISS'] if vmiss_to_None else None,
+                                    file_name=file_path.name, nlhead=nlhead)
+            na_1001['X'], na_1001['V'] = values[0], values[1:]
+            return na_1001
+
         na_1001['X'] = [] # holds independent variable
         na_1001['V'] = [[] for _ in range(n_vars)] # list for each dependent variable
 
@@ -195,3 +619,49 @@ def nasa_ames_1001_read(file_path, sep=" ", sep_com=";", sep_data="\t",
                     na_1001['V'][j].append(l[j+1])
 
     return na_1001
+
+
+if __name__ == '__main__':
+    # benchmark: python (list of strings) vs. numpy engine on synthetic data
+    import tempfile
+    import timeit
+    from nasa_ames_1001_write import nasa_ames_1001_write
+
+    n_rows, n_vars = 200_000, 20
+    rng = np.random.default_rng(42)
+    t = np.arange(n_rows, dtype=np.float64)
+    v = np.round(rng.normal(100, 10, (n_vars, n_rows)), 3)
+    v[:, ::50] = 99999.999
+
+    na = {'NLHEAD': 14+n_vars+1, 'FFI': 1001, 'ONAME': 'test', 'ORG': 'test',
+          'SNAME': 'synthetic', 'MNAME': 'benchmark', 'IVOL': 1, 'NVOL': 1,
+          'DATE': (2020, 1, 1), 'RDATE': (2020, 1, 1), 'DX': 1,
+          'XNAME': ['TimeCRef', 'seconds since 2020-01-01', 's'],
+          'NV': n_vars, 'VSCAL': ['1']*n_vars, 'VMISS': ['99999.999']*n_vars,
+          'VNAME': [f'v{i}; variable {i}; unit' for i in range(n_vars)],
+          'NSCOML': 0, 'SCOM': [], 'NNCOML': 1,
+          'NCOM': ['\t'.join(['TimeCRef']+[f'v{i}' for i in range(n_vars)])],
+          'X': t.tolist(), 'V': v.tolist()}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file = os.path.join(tmpdir, 'na1001_benchmark.txt')
+        nasa_ames_1001_write(file, na)
+        print(f"{n_rows} rows x {n_vars} variables, "
+              f"{os.path.getsize(file)/1024**2:.1f} MB")
+        kwargs = {'ensure_ascii': False, 'vmiss_to_None': True}
+        tests = {"check_lt128": lambda: check_lt128(file),
+                 "engine 'python'":
+                     lambda: nasa_ames_1001_read(file, **kwargs),
+                 "engine 'python' + conversion to float":
+                     lambda: np.array(nasa_ames_1001_read(file, **kwargs)['V'],
+                                      dtype=np.float64),
+                 "engine 'numpy'":
+                     lambda: nasa_ames_1001_read(file, engine='numpy', **kwargs)}
+        for name, func in tests.items():
+            dt = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{name}: {dt:.3f} s")
+        na_py = nasa_ames_1001_read(file, vmiss_to_None=True)
+        na_np = nasa_ames_1001_read(file, vmiss_to_None=True, engine='numpy')
+        assert all(na_py[k] == na_np[k] for k in na if k not in ('X', 'V'))
+        assert np.array_equal(np.array(na_py['V'], dtype=np.float64),
+                              na_np['V'], equal_nan=True)
@@ -9,11 +9,316 @@ more info on NASA AMES file format:
 """
 
 import os
+from itertools import chain
+
+import numpy as np
+
+from nbrs_in_stringfmt import NumStr
+
+
+def _is_int_spec(spec):
+    return spec is not None and spec.endswith('d}')
+
+
+def _holds_ints(col, vmiss=None):
+    """
+    True if all finite values of col (except VMISS) are integers.
+    """
+    col = np.asarray(col)
+    if col.dtype.kind in 'iub':
+        return True
+    if col.dtype.kind in 'OUS':
+        col = np.array([np.nan if (x is None or str(x).strip() == vmiss) else float(x)
+                        for x in col])
+    col = col[np.isfinite(col)]
+    return bool(np.all(col == np.rint(col)))
+
+
+def _data_fmt_specs(na_1001, data_fmt, strict=True):
+    """
+    get a list of format specs (str.format style) for X and V, or None.
+    data_fmt "vmiss" derives the format of each variable from its VMISS.
+    integer specs ('{:d}') are only used for columns that hold integers;
+    derived specs fall back to str() (None) for other columns, explicitly
+    given specs (strict) raise a ValueError, so data is never rounded.
+    """
+    if data_fmt is None:
+        return None
+    if data_fmt == "vmiss":
+        data_fmt, strict = [None] + [NumStr().analyse_format(str(vm))[0]
+                                     for vm in na_1001['VMISS']], False
+    if len(data_fmt) != na_1001['NV']+1:
+        raise ValueError("data_fmt must have NV+1 elements (X and V).")
+
+    specs = list(data_fmt)
+    for j, col in enumerate(chain((na_1001['X'],), na_1001['V'])):
+        if _is_int_spec(specs[j]) and not _holds_ints(col, na_1001['VMISS'][j-1] if j else None):
+            if strict:
+                raise ValueError(f"integer format {specs[j]} for column {j} "
+                                 "which holds non-integer values.")
+            specs[j] = None
+    return specs
+
+
+def _column_strings(col, spec=None, vmiss=None):
+    """
+    format the values of a column to strings; str() (as the list-based
+    implementation) if spec is None. NaN, None and values equal to VMISS
+    (compared in the dtype of col) are written as the VMISS string.
+    """
+    col = np.asarray(col)
+    if col.dtype.kind in 'OUS': # e.g. strings from nasa_ames_1001_read
+        if spec is None:
+            return [vmiss if x is None else str(x) for x in col]
+        col = np.array([np.nan if (x is None or str(x).strip() == vmiss) else float(x)
+                        for x in col])
+
+    missing = np.zeros(col.shape, dtype=np.bool_)
+    if vmiss is not None:
+        if col.dtype.kind == 'f':
+            missing = np.isnan(col) | (col == col.dtype.type(vmiss))
+        else:
+            missing = col == float(vmiss)
+    if spec is None:
+        if col.dtype.kind == 'f' and col.dtype != np.float64:
+            strings = col.astype(str).tolist() # shortest repr of e.g. float32
+        else:
+            strings = list(map(str, col.tolist()))
+    else:
+        values = np.where(missing, 0, col)
+        if _is_int_spec(spec):
+            values = np.rint(values).astype(np.int64)
+        strings = list(map(spec.format, values.tolist()))
+    for ix in np.flatnonzero(missing):
+        strings[ix] = vmiss
+    return strings
+
+
+def _write_data_np(file_obj, x, v, vmiss,
+                   sep_data="\t", crlf="\n", data_fmt=None, chunksize=10_000):
+    """
+    write the data block from numpy arrays (or anything that numpy can turn
+    into an array). the lines of a block of 'chunksize' rows are formatted
+    with a single string formatting call and written at once.
+    NaN in V is written as VMISS.
+    """
+    n_rows, n_vars = len(x), len(v)
+    row_fmt = sep_data.replace('%', '%%').join(['%s']*(n_vars+1))
+    row_fmt += crlf.replace('%', '%%')
+    if data_fmt is None:
+        data_fmt = [None]*(n_vars+1)
+
+    for i0 in range(0, n_rows, chunksize):
+        i1 = min(i0+chunksize, n_rows)
+        columns = [_column_strings(col[i0:i1], data_fmt[j], vmiss[j-1] if j else None)
+                   for j, col in enumerate(chain((x,), v))]
+        values = list(chain.from_iterable(zip(*columns)))
+        file_obj.write((row_fmt*(i1-i0)) % tuple(values))
+
+
+def _header_block(na_1001, sep=" ", sep_com=";", crlf="\n"):
+    """
+    format the header lines of a NASA AMES 1001 file as one string.
+    """
+    block = str(na_1001['NLHEAD']) + sep + str(na_1001['FFI']) + crlf
+    block += str(na_1001['ONAME']) + crlf
+    block += str(na_1001['ORG']) + crlf
+    block += str(na_1001['SNAME']) + crlf
+    block += str(na_1001['MNAME']) + crlf
+    block += str(na_1001['IVOL']) + sep + str(na_1001['NVOL']) + crlf
+
+    # dates: assume "yyyy m d" in tuple
+    block += (str('%4.4u' % (na_1001['DATE'])[0]) + sep +
+              str('%2.2u' % (na_1001['DATE'])[1]) + sep +
+              str('%2.2u' % (na_1001['DATE'])[2]) + sep +
+              str('%4.4u' % (na_1001['RDATE'])[0]) + sep +
+              str('%2.2u' % (na_1001['RDATE'])[1]) + sep +
+              str('%2.2u' % (na_1001['RDATE'])[2]) + crlf)
+
+    block += f"{na_1001['DX']:g}{crlf}"
+
+    block += sep_com.join(na_1001['XNAME']) + crlf
+
+    n_vars = na_1001['NV'] # get number of variables
+    block += str(n_vars) + crlf
+
+    for key in ('VSCAL', 'VMISS'):
+        line = ""
+        for i in range(n_vars):
+            line = line+str((na_1001[key])[i])+sep
+        if line.find("\n") > -1:
+            line = line[0:-1]
+        else:
+            line = line[0:-1] + crlf
+        block += line
+
+    for i in range(n_vars):
+        block += na_1001['VNAME'][i] + crlf
+
+    nscoml = na_1001['NSCOML'] # get number of special comment lines
+    block += str(nscoml) + crlf
+    for i in range(nscoml):
+        block += na_1001['SCOM'][i] + crlf
+
+    nncoml = na_1001['NNCOML'] # get number of normal comment lines
+    block += str(nncoml) + crlf
+    for i in range(nncoml):
+        block += na_1001['NCOM'][i] + crlf
+
+    return block
+
+
+def _write_data_block(file_obj, na_1001, sep_data="\t", crlf="\n",
+                      data_fmt=None, chunksize=10_000):
+    """
+    write the data lines (X and V) to file_obj.
+    """
+    if (data_fmt is not None or isinstance(na_1001['X'], np.ndarray)
+            or isinstance(na_1001['V'], np.ndarray)):
+        _write_data_np(file_obj, na_1001['X'], na_1001['V'], na_1001['VMISS'],
+                       sep_data=sep_data, crlf=crlf,
+                       data_fmt=_data_fmt_specs(na_1001, data_fmt),
+                       chunksize=chunksize)
+        return
+
+    n_vars = na_1001['NV']
+    nl_data = len(na_1001['X']) # lines of data to write
+    for i in range(nl_data):
+        line = str((na_1001['X'])[i]) + sep_data
+        for j in range(n_vars):
+            line = line + str((na_1001['V'][j])[i]) + sep_data
+        if line.find("\n") > -1:
+            line = line[0:-1]
+        else:
+            line = line[0:-1] + crlf
+        file_obj.write(line)
+
+
+def _read_last_lines(file_obj, start=0, blocksize=2**16):
+    """
+    return the last non-empty lines (bytes, stripped; last line last) of a
+    file opened in binary mode, at least one complete line, searching
+    backwards from the end down to offset start.
+    """
+    file_obj.seek(0, os.SEEK_END)
+    end = pos = file_obj.tell()
+    while pos > start:
+        pos = max(start, pos-blocksize)
+        file_obj.seek(pos)
+        tail = file_obj.read(end-pos).strip()
+        if b"\n" in tail or pos == start:
+            lines = tail.splitlines()
+            if pos > start: # first line may be incomplete
+                lines = lines[1:]
+            return [l.strip() for l in lines if l.strip()]
+    return []
+
+
+def _data_fmt_from_lines(lines, vmiss, sep_data="\t"):
+    """
+    derive the format spec of each column from existing data lines (the
+    last value that is not VMISS); None (str()) if unknown.
+    """
+    rows = [l.decode("ascii").split(sep_data) for l in lines]
+    specs = []
+    for j in range(len(vmiss)+1):
+        spec = None
+        for row in reversed(rows):
+            if j < len(row) and (j == 0 or row[j].strip() != vmiss[j-1]):
+                try:
+                    spec = NumStr().analyse_format(row[j])[0]
+                except TypeError: # e.g. nan
+                    pass
+                break
+        specs.append(spec)
+    return specs
+
+
+def _append_data(file_path, na_1001, sep=" ", sep_com=";", sep_data="\t",
+                 crlf="\n", data_fmt=None, chunksize=10_000,
+                 verboseprint=print):
+    """
+    append the rows of na_1001 with X greater than the last X in the existing
+    file. the header of the file must match the header of na_1001, except for
+    the revision date (RDATE) and the volume counters (IVOL, NVOL); these are
+    patched in-place if the line length does not change. X must be
+    increasing.
+    returns 3 if successful, 0 if the headers do not match.
+    """
+    header = _header_block(na_1001, sep=sep, sep_com=sep_com, crlf=crlf)
+    header = header.splitlines(keepends=True)
+
+    with open(file_path, "r+b") as file_obj:
+        header_file = [file_obj.readline() for _ in range(na_1001['NLHEAD'])]
+        data_start = file_obj.tell()
+
+        nlhead_file = int(header_file[0].split()[0])
+        if nlhead_file != na_1001['NLHEAD'] or len(header) != nlhead_file:
+            verboseprint(f"append failed: NLHEAD of {file_path} is {nlhead_file}, "
+                         f"expected {na_1001['NLHEAD']}. rewrite the file.")
+            return 0
+
+        patches, offset = [], 0
+        for ix, (old, new) in enumerate(zip(header_file, header)):
+            old_s, new_s = old.decode("ascii").rstrip("\r\n"), new.rstrip("\r\n")
+            if old_s != new_s:
+                # line 6: IVOL NVOL, line 7: DATE RDATE (DATE must not change)
+                may_change = ix == 5 or (ix == 6 and old_s.split()[:3] == new_s.split()[:3])
+                if not may_change:
+                    verboseprint(f"append failed: header line {ix+1} of {file_path} "
+                                 "does not match na_1001. rewrite the file.")
+                    return 0
+                if len(old_s) != len(new_s):
+                    verboseprint(f"append failed: header line {ix+1} of {file_path} "
+                                 "differs and has a different length. rewrite the file.")
+                    return 0
+                patches.append((offset, new_s))
+            offset += len(old)
+
+        for pos, line in patches: # fixed-length lines: overwrite in-place
+            file_obj.seek(pos)
+            file_obj.write(line.encode("ascii"))
+        if patches:
+            verboseprint(f"NA output: {len(patches)} header line(s) patched.")
+
+        last_lines = _read_last_lines(file_obj, start=data_start)
+        last_line = last_lines[-1] if last_lines else b""
+        missing_crlf = False
+        if file_obj.seek(0, os.SEEK_END) > data_start:
+            file_obj.seek(-1, os.SEEK_END)
+            missing_crlf = file_obj.read(1) not in b"\r\n"
+
+    x = np.asarray(na_1001['X'], dtype=np.float64)
+    i0 = 0
+    if last_line:
+        x_last = float(last_line.decode("ascii").split(sep_data)[0])
+        i0 = int(np.searchsorted(x, x_last, side='right'))
+
+    if i0 < x.size:
+        v = na_1001['V']
+        new_rows = {**na_1001, 'X': na_1001['X'][i0:],
+                    'V': v[:, i0:] if isinstance(v, np.ndarray) else [v_n[i0:] for v_n in v]}
+        if data_fmt is None and last_lines and (isinstance(na_1001['X'], np.ndarray) or
+                                                isinstance(v, np.ndarray)):
+            # format numbers like the existing rows
+            data_fmt = _data_fmt_specs(new_rows, _data_fmt_from_lines(
+                last_lines, na_1001['VMISS'], sep_data=sep_data), strict=False)
+        with open(file_path, "a", encoding="ascii") as file_obj:
+            if missing_crlf:
+                file_obj.write(crlf)
+            _write_data_block(file_obj, new_rows, sep_data=sep_data, crlf=crlf,
+                              data_fmt=data_fmt, chunksize=chunksize)
+    verboseprint(f"NA output: {x.size-i0} line(s) appended.")
+
+    return 3
+
 
 def nasa_ames_1001_write(file_path, na_1001,
                          sep=" ", sep_com=";", sep_data="\t",
                          crlf="\n", overwrite=False,
-                         verbose=False):
+                         verbose=False,
+                         data_fmt=None, chunksize=10_000,
+                         append=False):
     """
     writes dictionary 'na_1001' to text file in NASA AMES 1001 format.
     encoding is ASCII.
@@ -27,8 +332,25 @@ def nasa_ames_1001_write(file_path, na_1001,
         sep_data - separator used in data section
         crlf - newline character(s)
         overwrite - set to True to overwrite if file exists
+        data_fmt - format specs for the data block, used if X / V are numpy
+                   arrays or if data_fmt is specified. None: str() of each
+                   value. "vmiss": derive format of each variable from its
+                   VMISS (NumStr.analyse_format). Or a list of str.format
+                   specs for X and each variable, e.g. ['{:.1f}', '{:.3E}'].
+                   integer specs require integer data (ValueError); "vmiss"
+                   uses str() for non-integer variables instead.
+                   NaN values and values equal to VMISS in V are written as
+                   the VMISS string from the header.
+        chunksize - number of data lines formatted and written at once in
+                    the numpy-based implementation.
+        append - if the file exists, only append the rows with X greater than
+                 the last X in the file. the header in the file must match
+                 na_1001, except for RDATE and IVOL / NVOL, which are
+                 patched in-place if the line length does not change;
+                 otherwise nothing is written (returns 0). if data_fmt is None, numpy data is
+                 formatted like the last rows in the file.
     returns:
-        (int) 0 -> failed, 1 -> normal write, 2 -> overwrite
+        (int) 0 -> failed, 1 -> normal write, 2 -> overwrite, 3 -> append
     """
     verboseprint = print if verbose else lambda *a, **k: None
     # check if directory exists, create if not.
@@ -36,7 +358,7 @@ def nasa_ames_1001_write(file_path, na_1001,
         os.mkdir(os.path.dirname(file_path))
 
     # check if file exists, act according to overwrite keyword
-    if os.path.isfile(file_path):
+    if os.path.isfile(file_path) and not append:
         if not overwrite:
             verboseprint(f"write failed: {file_path} already exists.\n"
                           "set overwrite keyword to overwrite.")
@@ -71,90 +393,94 @@ def nasa_ames_1001_write(file_path, na_1001,
         verboseprint("NA output: NLHEAD corrected!")
         na_1001['NLHEAD'] = nlhead_is
 
+    if append and os.path.isfile(file_path):
+        return _append_data(file_path, na_1001, sep=sep, sep_com=sep_com,
+                            sep_data=sep_data, crlf=crlf, data_fmt=data_fmt,
+                            chunksize=chunksize, verboseprint=verboseprint)
+
     # begin the actual writing process
     with open(file_path, "w", encoding="ascii") as file_obj:
-        block = str(na_1001['NLHEAD']) + sep + str(na_1001['FFI']) + crlf
-        file_obj.write(block)
+        file_obj.write(_header_block(na_1001, sep=sep, sep_com=sep_com, crlf=crlf))
+        _write_data_block(file_obj, na_1001, sep_data=sep_data, crlf=crlf,
+                          data_fmt=data_fmt, chunksize=chunksize)
 
-        block = str(na_1001['ONAME']) + crlf
-        file_obj.write(block)
-
-        block = str(na_1001['ORG']) + crlf
-        file_obj.write(block)
-
-        block = str(na_1001['SNAME']) + crlf
-        file_obj.write(block)
-
-        block = str(na_1001['MNAME']) + crlf
-        file_obj.write(block)
-
-        block = str(na_1001['IVOL']) + sep + str(na_1001['NVOL']) + crlf
-        file_obj.write(block)
-
-        # dates: assume "yyyy m d" in tuple
-        block = (str('%4.4u' % (na_1001['DATE'])[0]) + sep +
-                 str('%2.2u' % (na_1001['DATE'])[1]) + sep +
-                 str('%2.2u' % (na_1001['DATE'])[2]) + sep +
-                 str('%4.4u' % (na_1001['RDATE'])[0]) + sep +
-                 str('%2.2u' % (na_1001['RDATE'])[1]) + sep +
-                 str('%2.2u' % (na_1001['RDATE'])[2]) + crlf)
-        file_obj.write(block)
+    return write
 
-        file_obj.write(f"{na_1001['DX']:g}{crlf}")
 
-        file_obj.write(sep_com.join(na_1001['XNAME']) + crlf)
+if __name__ == '__main__':
+    import tempfile
+    import timeit
 
-        n_vars = na_1001['NV'] # get number of variables
-        block = str(n_vars) + crlf
-        file_obj.write(block)
+    from nasa_ames_1001_read import nasa_ames_1001_read
 
-        line = ""
-        for i in range(n_vars):
-            line = line+str((na_1001['VSCAL'])[i])+sep
-        if line.find("\n") > -1:
-            line = line[0:-1]
+    # write -> read: VMISS (float and integer) is written as given in the header
+    na = {'NLHEAD': 16, 'FFI': 1001, 'ONAME': 'test', 'ORG': 'test',
+          'SNAME': 'synthetic', 'MNAME': 'vmiss check', 'IVOL': 1, 'NVOL': 1,
+          'DATE': (2020, 1, 1), 'RDATE': (2020, 1, 1), 'DX': 1,
+          'XNAME': ['TimeCRef', 'seconds since 2020-01-01', 's'],
+          'NV': 2, 'VSCAL': ['1', '1'], 'VMISS': ['99999.999', '99999'],
+          'VNAME': ['a; variable a; unit', 'b; variable b; unit'],
+          'NSCOML': 0, 'SCOM': [], 'NNCOML': 0, 'NCOM': [],
+          'X': np.arange(6, dtype=np.float64),
+          'V': np.array([[1.5, np.nan, 99999.999, 2.25, 3., 4.],
+                         [1.5, 99999., np.nan, 12., 7., 8.]])}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file = os.path.join(tmpdir, 'na1001_vmiss.txt')
+        for data_fmt in (None, "vmiss"):
+            nasa_ames_1001_write(file, na, overwrite=True, data_fmt=data_fmt)
+            na_r = nasa_ames_1001_read(file, vmiss_to_None=True)
+            for v_w, v_r in zip(na['V'], na_r['V']):
+                assert [None if np.isnan(v) or v in (99999., 99999.999) else v
+                        for v in v_w] == [None if v is None else float(v) for v in v_r]
+        # integer data with an integer VMISS -> '{:d}'
+        na_int = {**na, 'V': np.array([na['V'][0], [1, 99999, 3, 12, 7, 8]])}
+        nasa_ames_1001_write(file, na_int, overwrite=True, data_fmt="vmiss")
+        assert nasa_ames_1001_read(file)['V'][1] == ['1', '99999', '3', '12', '7', '8']
+        try: # explicit integer spec for non-integer data
+            nasa_ames_1001_write(file, na, overwrite=True, data_fmt=['{}', '{:.3f}', '{:d}'])
+        except ValueError:
+            pass
         else:
-            line = line[0:-1] + crlf
-        file_obj.write(line)
+            raise AssertionError("integer spec for non-integer data accepted")
+        # appended rows are formatted like the existing ones
+        na_app = {**na, 'X': na['X'][:3], 'V': na['V'][:, :3]}
+        nasa_ames_1001_write(file, na_app, overwrite=True, data_fmt=['{:.1f}', '{:.3f}', '{:.2f}'])
+        nasa_ames_1001_write(file, na, append=True)
+        lines = open(file).read().splitlines()[na['NLHEAD']:]
+        assert lines[-1].split("\t") == ['5.0', '4.000', '8.00'], lines
+        assert lines[1].split("\t") == ['1.0', '99999.999', '99999'], lines
+        # header must match for appending, except RDATE / IVOL, NVOL
+        for changed in ({'VNAME': na['VNAME'][::-1]}, {'VMISS': ['88888.888', '88888']}):
+            assert nasa_ames_1001_write(file, {**na, **changed}, append=True) == 0
+        assert nasa_ames_1001_write(file, {**na, 'RDATE': (2021, 2, 3)}, append=True) == 3
+        assert open(file).read().splitlines()[6] == "2020 01 01 2021 02 03"
+        assert nasa_ames_1001_write(file, {**na, 'DATE': (2021, 2, 3)}, append=True) == 0
 
-        line = ""
-        for i in range(n_vars):
-            line = line+str((na_1001['VMISS'])[i])+sep
-        if line.find("\n") > -1:
-            line = line[0:-1]
-        else:
-            line = line[0:-1] + crlf
-        file_obj.write(line)
+    # benchmark: list-based vs. numpy-based writing of the data block
 
-        block = na_1001['VNAME']
-        for i in range(n_vars):
-            file_obj.write(block[i] + crlf)
-
-        nscoml = na_1001['NSCOML'] # get number of special comment lines
-        line = str(nscoml)+crlf
-        file_obj.write(line)
+    n_rows, n_vars = 43_200, 30 # 12 h of 1 Hz data
+    rng = np.random.default_rng(42)
+    v = np.round(rng.normal(100, 10, (n_vars, n_rows)), 3)
+    v[:, ::50] = np.nan
 
-        block = na_1001['SCOM']
-        for i in range(nscoml):
-            file_obj.write(block[i] + crlf)
+    na = {'NLHEAD': 14+n_vars, 'FFI': 1001, 'ONAME': 'test', 'ORG': 'test',
+          'SNAME': 'synthetic', 'MNAME': 'benchmark', 'IVOL': 1, 'NVOL': 1,
+          'DATE': (2020, 1, 1), 'RDATE': (2020, 1, 1), 'DX': 1,
+          'XNAME': ['TimeCRef', 'seconds since 2020-01-01', 's'],
+          'NV': n_vars, 'VSCAL': ['1']*n_vars, 'VMISS': ['99999.999']*n_vars,
+          'VNAME': [f'v{i}; variable {i}; unit' for i in range(n_vars)],
+          'NSCOML': 0, 'SCOM': [], 'NNCOML': 0, 'NCOM': [],
+          'X': np.arange(n_rows, dtype=np.float64), 'V': v}
 
-        nncoml = na_1001['NNCOML'] # get number of normal comment lines
-        line = str(nncoml)+crlf
-        file_obj.write(line)
-
-        block = na_1001['NCOM']
-        for i in range(nncoml):
-            file_obj.write(block[i] + crlf)
-
-        nl_data = len(na_1001['X']) # lines of data to write
-        for i in range(nl_data):
-            line = str((na_1001['X'])[i]) + sep_data
-            for j in range(n_vars):
-                line = line + str((na_1001['V'][j])[i]) + sep_data
-            if line.find("\n") > -1:
-                line = line[0:-1]
-            else:
-                line = line[0:-1] + crlf
-            file_obj.write(line)
+    na_lists = {**na, 'X': na['X'].tolist(),
+                'V': np.where(np.isnan(v), 99999.999, v).tolist()}
 
-    return write
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file = os.path.join(tmpdir, 'na1001_benchmark.txt')
+        tests = {"lists": lambda: nasa_ames_1001_write(file, na_lists, overwrite=True),
+                 "numpy, str()": lambda: nasa_ames_1001_write(file, na, overwrite=True),
+                 "numpy, vmiss fmt": lambda: nasa_ames_1001_write(file, na, overwrite=True,
+                                                                  data_fmt="vmiss")}
+        for name, func in tests.items():
+            dt = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{name}: {n_rows/dt:,.0f} rows/s")
@@ -6,7 +6,8 @@ Created on Mon Aug 20 11:23:26 2018
 """
 
 import numpy as np
-from numba import njit
+import pandas as pd
+from numba import njit, prange
 from scipy.interpolate import interp1d
 
 ###############################################################################
@@ -84,16 +85,18 @@ def mask_repeated_elems(arr):
     return mask
 
 @njit
-def mask_jumps(arr, thrsh, look_ahead, abs_delta=False):
+def _mask_jumps_core(arr, thrsh, look_ahead, abs_delta, mask, i, final):
     """
-    check the elements of array "arr" if the delta between element and
-    following element(s) exceed a threshold "trsh". How many elements to
-    look ahead is defined by "look_ahead"
+    loop of mask_jumps, starting at element i. unless final, stop at the
+    first element whose look-ahead window is not complete (more data needed;
+    elements before the returned index are done).
+    returns:
+        index of the element to continue with
     """
     n_el = arr.shape[0]
-    mask = np.ones(arr.shape).astype(np.bool_)
-    i = 0
     while i < n_el-1:
+        if not final and i + look_ahead >= n_el:
+            break
         cur, nxt = arr[i], arr[i+1]
         delta_0 = np.absolute(nxt-cur) if abs_delta else nxt-cur
         if delta_0 > thrsh:
@@ -105,8 +108,124 @@ def mask_jumps(arr, thrsh, look_ahead, abs_delta=False):
                 else:
                     break
         i += 1
+    return i
+
+@njit
+def mask_jumps(arr, thrsh, look_ahead, abs_delta=False):
+    """
+    check the elements of array "arr" if the delta between element and
+    following element(s) exceed a threshold "trsh". How many elements to
+    look ahead is defined by "look_ahead"
+    """
+    mask = np.ones(arr.shape).astype(np.bool_)
+    _mask_jumps_core(arr, thrsh, look_ahead, abs_delta, mask, 0, True)
     return mask
 
+
+class StreamingJumpFilter:
+    """
+    mask_jumps for data that arrives in chunks. elements whose look-ahead
+    window is not complete yet are kept (together with the last accepted
+    element, to which the following ones are compared) until the next
+    update, so that the concatenated output equals mask_jumps / filter_jumps_v2
+    applied to the concatenated data. at most look_ahead+1 elements are
+    pending.
+    """
+    def __init__(self, thrsh, look_ahead, abs_delta=False):
+        if not isinstance(look_ahead, int) or look_ahead < 1:
+            raise ValueError("parameter look_ahead must be an integer >=1.")
+        self.thrsh, self.look_ahead, self.abs_delta = thrsh, look_ahead, abs_delta
+        self._pending = np.empty(0, dtype=np.float64)
+
+    @property
+    def n_pending(self):
+        """ number of elements that were added but not returned yet. """
+        return self._pending.size
+
+    def _run(self, final):
+        mask = np.ones(self._pending.shape, dtype=np.bool_)
+        i = _mask_jumps_core(self._pending, self.thrsh, self.look_ahead,
+                             self.abs_delta, mask, 0, final)
+        n_done = self._pending.size if final else i
+        values, mask = self._pending[:n_done].copy(), mask[:n_done]
+        values[~mask] = np.nan
+        self._pending = self._pending[n_done:]
+        return values, mask
+
+    def update(self, chunk):
+        """
+        add a chunk of data (1D).
+        returns:
+            tuple (values, mask) for the elements that are done, in stream
+            order (may be fewer or more than in chunk); values are NaN where
+            mask is False (jump), as with filter_jumps_v2.
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim != 1:
+            raise ValueError("chunk must be a 1d array.")
+        self._pending = np.concatenate((self._pending, chunk))
+        return self._run(final=False)
+
+    def flush(self):
+        """
+        end of stream; returns (values, mask) of all pending elements.
+        """
+        return self._run(final=True)
+
+
+def _mask_jumps_cols(arr, thrsh, look_ahead, abs_delta, mask):
+    """
+    mask_jumps for each row of arr (one variable per row, C-contiguous);
+    rows run in parallel (prange) in the parallel compiled version.
+    """
+    for j in prange(arr.shape[0]):
+        mask[j] = mask_jumps(arr[j], thrsh[j], look_ahead[j], abs_delta[j])
+
+_mask_jumps_cols_seq = njit(_mask_jumps_cols)
+_mask_jumps_cols_par = njit(parallel=True)(_mask_jumps_cols)
+
+
+def mask_jumps_multi(V, thrsh, look_ahead, abs_delta=False, parallel=True):
+    """
+    apply mask_jumps to many variables (columns) at once.
+    inputs:
+        V: 2D np.ndarray (one column per variable) or pandas DataFrame.
+        thrsh, look_ahead, abs_delta: see mask_jumps; one value for all
+            columns or one per column (list / array; dict by column name
+            for a DataFrame).
+        parallel: process columns in parallel threads (numba prange).
+    returns:
+        boolean mask with the shape of V (False: jump); DataFrame with the
+        same index and columns if V is a DataFrame.
+    """
+    index = columns = None
+    if isinstance(V, pd.DataFrame):
+        index, columns = V.index, V.columns
+        thrsh, look_ahead, abs_delta = [[p[c] for c in columns] if isinstance(p, dict) else p
+                                        for p in (thrsh, look_ahead, abs_delta)]
+        V = V.to_numpy(dtype=np.float64)
+    if not isinstance(V, np.ndarray) or V.ndim != 2:
+        raise ValueError("input must be 2D numpy ndarray or pandas DataFrame.")
+
+    n_el, n_cols = V.shape
+    thrsh = np.broadcast_to(np.asarray(thrsh, dtype=np.float64), (n_cols,))
+    look_ahead = np.broadcast_to(np.asarray(look_ahead), (n_cols,))
+    abs_delta = np.broadcast_to(np.asarray(abs_delta, dtype=np.bool_), (n_cols,))
+    if not np.issubdtype(look_ahead.dtype, np.integer):
+        raise ValueError("parameter look_ahead must be an integer.")
+    if np.any(look_ahead >= n_el) or np.any(look_ahead < 1):
+        raise ValueError(f"parameter look_ahead must be >=1 and <{n_el}.")
+
+    arr = np.ascontiguousarray(V.T, dtype=np.float64)
+    mask = np.empty(arr.shape, dtype=np.bool_)
+    kernel = _mask_jumps_cols_par if parallel else _mask_jumps_cols_seq
+    kernel(arr, np.ascontiguousarray(thrsh), look_ahead.astype(np.int64),
+           np.ascontiguousarray(abs_delta), mask)
+
+    mask = mask.T
+    return mask if columns is None else pd.DataFrame(mask, index=index, columns=columns)
+
+
 def filter_jumps_v2(arr, thrsh, look_ahead,
                     abs_delta=False,
                     vmiss=np.nan,
@@ -144,12 +263,102 @@ def filter_jumps_v2(arr, thrsh, look_ahead,
 ###############################################################################
 
 
+@njit
+def _filter_jumps_kernel(v, max_delta, no_val, use_abs_delta,
+                         reset_buffer_after, remove_doubles, ix_del, ix_rem):
+    """
+    single pass of filter_jumps_np; writes deleted / remaining indices to
+    ix_del / ix_rem and returns how many were written to each. v is not
+    modified.
+    """
+    n_del, n_rem = 0, 0
+    buffer, n_jumps = 0., 0 # buffer value 0 counts as "not filled"
+    for ix in range(v.shape[0]):
+        v_ix = v[ix]
+        if not np.isfinite(v_ix) or v_ix == no_val:
+            ix_rem[n_rem] = ix
+            n_rem += 1
+            continue  # skip line if value is np.nan
+
+        if buffer == 0.:
+            buffer = v_ix
+            ix_rem[n_rem] = ix
+            n_rem += 1
+            continue  # fill buffer if not done so yet
+
+        delta = abs(v_ix-buffer) if use_abs_delta else v_ix-buffer
+
+        if delta > max_delta:  # jump found!
+            ix_del[n_del] = ix
+            n_del += 1
+            n_jumps += 1
+            if reset_buffer_after and n_jumps == reset_buffer_after:
+                buffer, n_jumps = v_ix, 0
+        else:  # no jump,...
+            buffer = v_ix
+            if remove_doubles and delta == 0.:  # double found!
+                ix_del[n_del] = ix
+                n_del += 1
+            else:
+                ix_rem[n_rem] = ix
+                n_rem += 1
+
+    return n_del, n_rem
+
+
 def filter_jumps_np(v, max_delta, no_val=np.nan, use_abs_delta=True,
                     reset_buffer_after=3, remove_doubles=False,
                     # if v is dependent on another variable x (e.g. time),
                     # IF x is not equidistant, do NOT use interpolation:
-                    interpol_jumps=False, interpol_kind='linear'):
+                    interpol_jumps=False, interpol_kind='linear',
+                    use_numba=True):
+    """
+    filter jumps > max_delta relative to the last accepted value (buffer);
+    after reset_buffer_after jumps, the buffer is reset to the current value.
+    remove_doubles: also delete values equal to the buffer.
+    use_numba: single pass with a compiled kernel (default); False runs the
+    python loop. v is not modified; deleted values are set to no_val in a
+    copy ('filtered').
+    returns:
+        dict with 'filtered', 'ix_del' (deleted indices) and 'ix_rem'
+        (remaining indices, including invalid values)
+    """
+    v = np.array(v) # copy; do not touch the input
+    len_v = len(v)
+
+    if use_numba:
+        ix_del = np.empty(len_v, dtype='int32')
+        ix_rem = np.empty(len_v, dtype='int32')
+        n_del, n_rem = _filter_jumps_kernel(np.asarray(v, dtype=np.float64), max_delta,
+                                            float(no_val), use_abs_delta,
+                                            int(reset_buffer_after or 0), remove_doubles,
+                                            ix_del, ix_rem)
+        ix_del, ix_rem = ix_del[:n_del], ix_rem[:n_rem]
+        v[ix_del] = no_val
+    else:
+        ix_del, ix_rem = _filter_jumps_py(v, max_delta, no_val, use_abs_delta,
+                                          reset_buffer_after, remove_doubles)
 
+    if interpol_jumps:
+        tmp_x = (np.arange(0, len_v))[ix_rem]
+        tmp_y = v[ix_rem]
+        f_ip = interp1d(tmp_x, tmp_y,
+                        kind=interpol_kind, fill_value='extrapolate')
+        filtered = f_ip(np.arange(0, len_v))
+    else:
+        w_valid = np.where(v != no_val)
+        filtered = v[w_valid]
+
+    return {'filtered': filtered,
+            'ix_del': ix_del,
+            'ix_rem': ix_rem}
+
+
+def _filter_jumps_py(v, max_delta, no_val, use_abs_delta,
+                     reset_buffer_after, remove_doubles):
+    """
+    python loop of filter_jumps_np; sets deleted elements of v to no_val.
+    """
     len_v = len(v)
 
     ix_del = np.full(len_v, -1, dtype='int32')  # deletion index
@@ -196,19 +405,7 @@ def filter_jumps_np(v, max_delta, no_val=np.nan, use_abs_delta=True,
     w_valid = np.where(ix_rem != -1)
     ix_rem = ix_rem[w_valid]
 
-    if interpol_jumps:
-        tmp_x = (np.arange(0, len_v))[ix_rem]
-        tmp_y = v[ix_rem]
-        f_ip = interp1d(tmp_x, tmp_y,
-                        kind=interpol_kind, fill_value='extrapolate')
-        filtered = f_ip(np.arange(0, len_v))
-    else:
-        w_valid = np.where(v != no_val)
-        filtered = v[w_valid]
-
-    return {'filtered': filtered,
-            'ix_del': ix_del,
-            'ix_rem': ix_rem}
+    return ix_del, ix_rem
 
 
 ###############################################################################
@@ -236,3 +433,45 @@ def del_at_edge(v, n_cut, add=2, out_len='same'):
 
 
 ###############################################################################
+
+
+if __name__ == '__main__':
+    import timeit
+
+    # benchmark: filter_jumps_np, python loop vs. numba kernel;
+    # one flight of 10 Hz data
+    rng = np.random.default_rng(42)
+    v = np.cumsum(rng.normal(0, 0.1, 360_000)) + 100
+    v[rng.integers(0, v.size, 1000)] += 50 # spikes
+    v[rng.integers(0, v.size, 1000)] = np.nan
+    ref = filter_jumps_np(v, 5, use_numba=False)
+    res = filter_jumps_np(v, 5)
+    assert all(np.array_equal(ref[k], res[k], equal_nan=True) for k in ref)
+    for use_numba in (False, True):
+        dt = min(timeit.repeat(lambda: filter_jumps_np(v, 5, use_numba=use_numba),
+                               number=1, repeat=3))
+        print(f"filter_jumps_np, {v.size} elements, use_numba={use_numba}: {dt:.4f} s")
+
+    # benchmark: mask_jumps per column vs. mask_jumps_multi, 50 channels
+    V = np.cumsum(rng.normal(0, 0.1, (360_000, 50)), axis=0)
+    V[rng.random(V.shape) < 0.001] += 50
+    thrsh = rng.uniform(2, 5, 50)
+    mask_jumps_multi(V[:10], thrsh, 2) # compile
+    mask_jumps_multi(V[:10], thrsh, 2, parallel=False)
+    dt_loop = min(timeit.repeat(lambda: [mask_jumps(V[:, j], thrsh[j], 2) for j in range(50)],
+                                number=1, repeat=3))
+    dt_seq = min(timeit.repeat(lambda: mask_jumps_multi(V, thrsh, 2, parallel=False),
+                               number=1, repeat=3))
+    dt_par = min(timeit.repeat(lambda: mask_jumps_multi(V, thrsh, 2), number=1, repeat=3))
+    print(f"mask_jumps, 50 columns: loop {dt_loop:.4f} s, mask_jumps_multi {dt_seq:.4f} s, "
+          f"parallel {dt_par:.4f} s")
+
+    # streaming: StreamingJumpFilter with chunks of 100 elements vs. mask_jumps
+    v = V[:, 0]
+    def stream(chunksize=100):
+        jf = StreamingJumpFilter(thrsh[0], 2)
+        masks = [jf.update(v[i:i+chunksize])[1] for i in range(0, v.size, chunksize)]
+        return np.concatenate(masks + [jf.flush()[1]])
+    assert np.array_equal(stream(), mask_jumps(v, thrsh[0], 2))
+    dt = min(timeit.repeat(stream, number=1, repeat=3))
+    print(f"StreamingJumpFilter, {v.size} elements in chunks of 100: {dt:.4f} s")